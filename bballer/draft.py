@@ -1,7 +1,8 @@
-from typing import Iterator
+from typing import Iterator, List
 
 from bballer.models.draft import PlayerInDraft
 from bballer.scrapers.DraftPageScraper import DraftPageScraper
+from bballer.scrapers.base import scrape_async
 
 
 def get_url(year) -> str:
@@ -10,3 +11,9 @@ def get_url(year) -> str:
 
 def year(year: int) -> Iterator[PlayerInDraft]:
     return DraftPageScraper(get_url(year)).get_content()
+
+
+async def year_async(year: int) -> List[PlayerInDraft]:
+    """Like year, but returns a list rather than an iterator, as the picks are parsed off the event loop."""
+    url = get_url(year)
+    return await scrape_async(url, lambda content: list(DraftPageScraper(url, content).get_content()))
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
 
+from bballer.scrapers.schema import Schema, Column, to_float
+
 
 @dataclass
 class AdvancedStatLine:
@@ -24,6 +26,27 @@ class AdvancedStatLine:
     value_over_replacement_player: float
     box_plus_minus: float = field(init=False)
     win_shares: float = field(init=False)
+    columns = Schema(
+        player_efficiency_rating=Column("per", to_float),
+        true_shooting_percentage=Column("ts_pct", to_float),
+        three_fg_attempt_rate=Column("fg3a_per_fga_pct", to_float),
+        ft_attempt_rate=Column("fta_per_fga_pct", to_float),
+        offensive_rebound_percentage=Column("orb_pct", to_float),
+        defensive_rebound_percentage=Column("drb_pct", to_float),
+        total_rebound_percentage=Column("trb_pct", to_float),
+        assist_percentage=Column("ast_pct", to_float),
+        steal_percentage=Column("stl_pct", to_float),
+        block_percentage=Column("blk_pct", to_float),
+        turnover_percentage=Column("tov_pct", to_float),
+        usage_percentage=Column("usg_pct", to_float),
+        offensive_win_shares=Column("ows", to_float),
+        defensive_win_shares=Column("dws", to_float),
+        win_shares_per_48=Column("ws_per_48", to_float),
+        offensive_box_plus_minus=Column("obpm", to_float),
+        defensive_box_plus_minus=Column("dbpm", to_float),
+        value_over_replacement_player=Column("vorp", to_float),
+    )
+    # every field but the season, which is parsed from the row's "season" column
 
     def __repr__(self):
         return f"AdvancedStatLine({self.season})"
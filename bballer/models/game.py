@@ -2,6 +2,7 @@ from datetime import date
 from typing import Tuple, List
 
 from bballer.models.team import TeamShell
+from bballer.scrapers.schema import Schema, Column, to_int, to_str
 
 
 class CondensedGamelog(object):
@@ -25,6 +26,26 @@ class CondensedGamelog(object):
     fouls: int
     plus_minus: int
     points: int
+    columns = Schema(player_id=Column("player", to_str, attr="data-append-csv"))
+    box_score_columns = Schema(
+        seconds_played=Column("mp", to_int, attr="csk"),
+        fg_made=Column("fg", to_int),
+        fg_attempted=Column("fga", to_int),
+        three_fg_made=Column("fg3", to_int),
+        three_fg_attempted=Column("fg3a", to_int),
+        ft_made=Column("ft", to_int),
+        ft_attempted=Column("fta", to_int),
+        offensive_rebounds=Column("orb", to_int),
+        defensive_rebounds=Column("drb", to_int),
+        assists=Column("ast", to_int),
+        steals=Column("stl", to_int),
+        blocks=Column("blk", to_int),
+        turnovers=Column("tov", to_int),
+        fouls=Column("pf", to_int),
+        points=Column("pts", to_int),
+        plus_minus=Column("plus_minus", to_int),
+    )
+    # only set for the players who played
 
 
 class Game:
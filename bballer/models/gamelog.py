@@ -2,6 +2,7 @@ from datetime import date
 
 from bballer.models.team import TeamShell
 from bballer.scrapers.GameScraper import GameScraper
+from bballer.scrapers.schema import Schema, Column, to_int, to_float, to_str
 
 
 class GameLog:
@@ -30,6 +31,31 @@ class GameLog:
     plus_minus: int
     points: int
     game_url: str
+    columns = Schema(
+        date=Column("date_game", date.fromisoformat),
+        age=Column("age", to_str),
+        result=Column("game_result", to_str),
+    )
+    box_score_columns = Schema(
+        seconds_played=Column("mp", to_int, attr="csk"),
+        fg_made=Column("fg", to_int),
+        fg_attempted=Column("fga", to_int),
+        three_fg_made=Column("fg3", to_int),
+        three_fg_attempted=Column("fg3a", to_int),
+        ft_made=Column("ft", to_int),
+        ft_attempted=Column("fta", to_int),
+        offensive_rebounds=Column("orb", to_int),
+        defensive_rebounds=Column("drb", to_int),
+        assists=Column("ast", to_int),
+        steals=Column("stl", to_int),
+        blocks=Column("blk", to_int),
+        turnovers=Column("tov", to_int),
+        fouls=Column("pf", to_int),
+        points=Column("pts", to_int),
+        game_score=Column("game_score", to_float),
+        plus_minus=Column("plus_minus", to_int),
+    )
+    # None for the games the player didn't play in
 
     def __repr__(self):
         return f"GameLog(points={self.points}, rebounds={self.rebounds}, assists={self.assists})"
@@ -0,0 +1,70 @@
+from threading import Lock
+from typing import Sequence, TypeVar, Iterable, List, Iterator, Optional
+
+T = TypeVar("T")
+
+
+class LazySequence(Sequence[T]):
+    """
+    A sequence whose items are produced by {items} the first time they are needed, and kept from then on, so it can be
+    iterated any number of times while every item is only produced once.
+    Like the generators it replaces, next() returns the items one by one as well. If {items} raises an error, it is
+    raised again whenever items beyond the ones produced before are needed, rather than the sequence ending there.
+    """
+
+    def __init__(self, items: Iterable[T]):
+        self._source = iter(items)
+        self._items: List[T] = []
+        self._exhausted = False
+        self._error: Optional[BaseException] = None
+        self._lock = Lock()
+        self._next = 0
+
+    def _fill(self, count: int = None) -> int:
+        """Produces items until there are {count} of them, or all of them if {count} is None."""
+        with self._lock:
+            while not self._exhausted and (count is None or len(self._items) < count):
+                if self._error is not None:
+                    # a generator which raised is finished, so it would only raise StopIteration from now on
+                    raise self._error
+                try:
+                    self._items.append(next(self._source))
+                except StopIteration:
+                    self._exhausted = True
+                    self._source = None
+                except Exception as e:
+                    self._error = e
+                    raise
+            return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        i = 0
+        while i < len(self._items) or self._fill(i + 1) > i:
+            yield self._items[i]
+            i += 1
+
+    def __next__(self) -> T:
+        if self._fill(self._next + 1) <= self._next:
+            raise StopIteration
+        self._next += 1
+        return self._items[self._next - 1]
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self._fill(index + 1)
+        else:
+            self._fill()
+        return self._items[index]
+
+    def __len__(self) -> int:
+        return self._fill()
+
+    def __bool__(self) -> bool:
+        return self._fill(1) > 0
+
+    def __reduce__(self):
+        # pickled with all of its items, the source they come from can't be pickled
+        return LazySequence, (list(self),)
+
+    def __repr__(self):
+        return f"LazySequence({self._items}{'' if self._exhausted else ' ...'})"
@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import date
-from typing import List, Optional, Generator
+from typing import List, Optional, Sequence, Callable, Dict, Any
 
 from bballer.models.stats import StatLine, SeasonStatLine, PlayoffStatLine
 from bballer.models.team import TeamShell
@@ -42,14 +42,53 @@ class Player:
     _height: int
     _weight: int
     position: str
-    seasons: Generator[SeasonStatLine, None, None]
-    playoffs: Generator[PlayoffStatLine, None, None]
+    seasons: Sequence[SeasonStatLine]
+    playoffs: Sequence[PlayoffStatLine]
     career_stats: StatLine
     draft_pick: DraftPick
     id: str
     shooting_hand: str
     contract: Contract
     salaries: List[Salary]
+    _load = None
+    # loads the sections of a lazy player which haven't been accessed yet, see Player.lazy
+
+    @classmethod
+    def lazy(cls, id_: str, load: Callable[[str], Dict[str, Any]]) -> "Player":
+        """
+        Returns a player whose fields other than the id are only loaded when they are first accessed.
+        @param id_: the id of the player.
+        @param load: called with the name of a field, returns the values of that field and of any fields loaded along
+        with it, e.g. {"_height": 81, "_weight": 250}.
+        """
+        player = cls.__new__(cls)
+        object.__setattr__(player, "id", id_)
+        object.__setattr__(player, "_load", load)
+        return player
+
+    def __getattr__(self, name):
+        # only called for attributes which aren't set, i.e. the sections of a lazy player which haven't been loaded
+        load = self.__dict__.get("_load")
+        if load is None or name.startswith("__") or name not in self.__dataclass_fields__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        for key, value in load(name).items():
+            object.__setattr__(self, key, value)
+        return self.__dict__[name]
+
+    def materialize(self) -> "Player":
+        """Loads every section of a lazy player, including all of its seasons, and lets go of the page it was
+        scraped from. Returns the player itself."""
+        for f in fields(self):
+            getattr(self, f.name)
+        len(self.seasons)
+        len(self.playoffs)
+        object.__setattr__(self, "_load", None)
+        return self
+
+    def __getstate__(self):
+        # a lazy player is pickled with every section loaded, the page they're loaded from can't be pickled
+        self.materialize()
+        return dict(self.__dict__)
 
     def __repr__(self):
         return f"Player({self.name}, {self.date_of_birth})"
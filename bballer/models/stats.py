@@ -1,9 +1,11 @@
 from dataclasses import dataclass, field
-from typing import Optional, Generator
+from typing import Optional, Sequence
 
 from bballer.models.advanced_stats import AdvancedStatLine
 from bballer.models.gamelog import GameLog
+from bballer.models.lazy import LazySequence
 from bballer.scrapers.GameLogScraper import GameLogScraper, PlayoffGameLogScraper
+from bballer.scrapers.schema import Schema, Column, to_int, to_float, to_str
 
 
 @dataclass
@@ -14,6 +16,15 @@ class ShootingByDistance:
     ten_sixteen: float
     sixteen_three_pt: float
     three_point: float
+    fga_columns = Schema(two_point=Column("fg2a_pct_fga", to_float), zero_three=Column("pct_fga_00_03", to_float),
+                         three_ten=Column("pct_fga_03_10", to_float), ten_sixteen=Column("pct_fga_10_16", to_float),
+                         sixteen_three_pt=Column("pct_fga_16_xx", to_float),
+                         three_point=Column("fg3a_pct_fga", to_float))
+    # the share of field goal attempts from each distance
+    fgp_columns = Schema(two_point=Column("fg2_pct", to_float), zero_three=Column("fg_pct_00_03", to_float),
+                         three_ten=Column("fg_pct_03_10", to_float), ten_sixteen=Column("fg_pct_10_16", to_float),
+                         sixteen_three_pt=Column("fg_pct_16_xx", to_float), three_point=Column("fg3_pct", to_float))
+    # the field goal percentage from each distance
 
 
 class ShootingStatLine:
@@ -28,6 +39,17 @@ class ShootingStatLine:
     three_point_fga_assisted: float
     corner_three_point_fga: float
     corner_three_point_fgp: float
+    columns = Schema(
+        avg_distance=Column("avg_dist", to_float),
+        two_point_fga_assisted=Column("fg2_pct_ast", to_float),
+        dunks_fga=Column("pct_fg2_dunk", to_float),
+        dunks_made=Column("fg2_dunk", to_int),
+        three_point_fga_assisted=Column("fg3_pct_ast", to_float),
+        corner_three_point_fga=Column("pct_fg3a_corner", to_float),
+        corner_three_point_fgp=Column("fg3_pct_corner", to_float),
+        heaves_attempted=Column("fg3a_heave", to_int),
+        heaves_made=Column("fg3_heave", to_int),
+    )
 
 
 @dataclass
@@ -57,6 +79,29 @@ class StatLine:
     shooting_data: ShootingStatLine
     _round_digits = 3
     shooting_data_table_id = "shooting"
+    columns = Schema(
+        games_played=Column("g", to_int),
+        games_started=Column("gs", to_int),
+        minutes_played=Column("mp", to_int),
+        position=Column("pos", to_str),
+        fg_made=Column("fg", to_int),
+        fg_attempted=Column("fga", to_int),
+        three_fg_made=Column("fg3", to_int),
+        three_fg_attempted=Column("fg3a", to_int),
+        two_fg_made=Column("fg2", to_int),
+        two_fg_attempted=Column("fg2a", to_int),
+        effective_fg_percentage=Column("efg_pct", to_float),
+        ft_made=Column("ft", to_int),
+        ft_attempted=Column("fta", to_int),
+        offensive_rebounds=Column("orb", to_int),
+        defensive_rebounds=Column("drb", to_int),
+        assists=Column("ast", to_int),
+        steals=Column("stl", to_int),
+        blocks=Column("blk", to_int),
+        turnovers=Column("tov", to_int),
+        fouls=Column("pf", to_int),
+        points=Column("pts", to_int),
+    )
 
     @property
     def two_fg_percentage(self):
@@ -94,13 +139,13 @@ class SeasonStatLine:
     age: int
     all_star: bool
     team: str
-    _game_logs: Generator = field(init=False, default=None)
+    _game_logs: Sequence[GameLog] = field(init=False, default=None)
     shooting_data_table_id = "shooting"
 
-    def game_logs(self) -> Generator[GameLog, None, None]:
-        if not self._game_logs:
+    def game_logs(self) -> Sequence[GameLog]:
+        if self._game_logs is None:
             scr = self.new_gamelog_scraper()
-            self._game_logs = scr.get_content()
+            self._game_logs = LazySequence(scr.get_content())
         return self._game_logs
 
     def get_game_log_url(self):
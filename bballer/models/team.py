@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import List, Dict
 
+from bballer.scrapers.schema import Schema, Column, to_int, to_float, to_str
+
 
 @dataclass
 class TeamSeason:
@@ -18,6 +20,17 @@ class TeamSeason:
     rel_drtg: float
     _team_code: str
     _roster: List[Dict] = field(init=False, default_factory=list)
+    columns = Schema(
+        season=Column("season", to_str),
+        wins=Column("wins", to_int),
+        losses=Column("losses", to_int),
+        pace=Column("pace", to_float),
+        rel_pace=Column("pace_rel", to_float),
+        ortg=Column("off_rtg", to_float),
+        rel_ortg=Column("off_rtg_rel", to_float),
+        drtg=Column("def_rtg", to_float),
+        rel_drtg=Column("def_rtg_rel", to_float),
+    )
 
     @property
     def roster(self) -> List[Dict]:
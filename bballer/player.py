@@ -1,11 +1,18 @@
-from typing import Optional, Iterator
+from typing import Optional, Iterator, AsyncIterator
 
 from bballer.models.player import Player
 from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
 from bballer.scrapers.Search import Search
+from bballer.scrapers.base import scrape_async
+from bballer.scrapers.download import Download
+from bballer.scrapers.journal import Journal
 from bballer.scrapers.misc import TotalMinutesScraper, BulkScraper
 
 
+def get_url(_id: str) -> str:
+    return f"https://www.basketball-reference.com/players/{_id[0]}/{_id}.html"
+
+
 def get_by_name(name: str) -> Optional[Player]:
     result = Search.search_players(name)
     if not result:
@@ -14,21 +21,50 @@ def get_by_name(name: str) -> Optional[Player]:
     return PlayerPageScraper(url).get_content()
 
 
-def all_in_season(season: int) -> Iterator[Player]:
+def all_in_season(season: int, journal: Journal = None) -> Iterator[Player]:
+    """
+    @param journal: if specified, the players are recorded in it, and an interrupted run which is started again with
+    the same journal only scrapes the players it didn't get to, e.g. all_in_season(2020, Journal("2020.db")).
+    """
     url_scraper = TotalMinutesScraper(season)
     urls = url_scraper.get_player_urls()
-    scraper = BulkScraper(urls)
+    scraper = BulkScraper(urls, journal=journal)
     return scraper.scrape_all()
 
 
+async def all_in_season_async(season: int, journal: Journal = None) -> AsyncIterator[Player]:
+    """
+    @param journal: if specified, the players are recorded in it, and the players it already has are not scraped
+    again, like for all_in_season.
+    """
+    async with Download.async_session():
+        urls = await scrape_async(TotalMinutesScraper.get_url(season),
+                                  lambda content: TotalMinutesScraper(season, content).get_player_urls())
+        async for player in BulkScraper(urls, journal=journal).scrape_all_async():
+            yield player
+
+
 def search(term: str):
     return Search.search_players(term)
 
 
-def get_by_url(url: str) -> Player:
-    return PlayerPageScraper(url).get_content()
+def get_by_url(url: str, lazy: bool = False) -> Player:
+    """
+    @param lazy: if True, the sections of the player are only parsed when they are first accessed, e.g.
+    get_by_url(url, lazy=True).date_of_birth skips the stat tables. Player.materialize() parses everything.
+    """
+    return _player(PlayerPageScraper(url), lazy)
 
 
-def get_by_id(_id: str) -> Player:
-    url = f"https://www.basketball-reference.com/players/{_id[0]}/{_id}.html"
-    return PlayerPageScraper(url).get_content()
+def get_by_id(_id: str, lazy: bool = False) -> Player:
+    return get_by_url(get_url(_id), lazy)
+
+
+async def get_by_id_async(_id: str, lazy: bool = False) -> Player:
+    url = get_url(_id)
+    return await scrape_async(url, lambda content: _player(PlayerPageScraper(url, content), lazy))
+
+
+def _player(scraper: PlayerPageScraper, lazy: bool) -> Player:
+    # a lazy player parses the page as it goes, so only an eager one can be detached from it, see use_detached
+    return scraper.player(lazy=True) if lazy else scraper.get_content()
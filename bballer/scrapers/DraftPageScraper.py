@@ -1,27 +1,39 @@
 from typing import Iterator
 
+from bs4 import SoupStrainer
+
 from bballer.models.draft import PlayerInDraft
 from bballer.models.player import PlayerShell
 from bballer.models.team import TeamShell
-from bballer.scrapers.base import Scraper, get_data_stat_in_element
+from bballer.scrapers.base import Scraper, DataStatRow
 from bballer.scrapers.utilities import to_absolute_url
 
 
 class DraftPageScraper(Scraper):
+    regions = (SoupStrainer("table", id="stats"),)
 
     def get_content(self) -> Iterator[PlayerInDraft]:
-        table = self._parsed.find("table", id="stats")
+        return self._detach(self._get_picks())
+
+    def _get_picks(self) -> Iterator[PlayerInDraft]:
+        table = self.get_table_with_id("stats")
         for tr in table.find("tbody").find_all("tr"):
+            if "thead" in tr.attrs.get("class", []):
+                continue  # the header is repeated between rounds
             yield self._parse_row(tr)
 
     def _parse_row(self, tr) -> PlayerInDraft:
-        link = get_data_stat_in_element("player", tr, return_first_child=True)
-        player = PlayerShell(name=link.get_text(), url=to_absolute_url(link.attrs["href"]))
-        pick = get_data_stat_in_element("pick_overall", tr, "csk")
-        college = get_data_stat_in_element("college_name", tr, "csk")
+        stats = DataStatRow(tr)
+        link = stats.get("player", return_first_child=True)
+        if link:
+            player = PlayerShell(name=link.get_text(), url=to_absolute_url(link.attrs["href"]))
+        else:  # the player never made it to the league, so there is no player page
+            player = PlayerShell(name=stats.get("player"), url=None)
+        pick = stats.get("pick_overall", "csk")
+        college = stats.get("college_name", "csk")
         college = college if college != "Zzz" else None  # remarkable placeholder
-        years = int(get_data_stat_in_element("seasons", tr))
-        team_link = get_data_stat_in_element("team_id", tr, return_first_child=True)
+        years = int(stats.get("seasons") or 0)
+        team_link = stats.get("team_id", return_first_child=True)
         team = TeamShell(name=team_link.attrs["title"],
                          url=to_absolute_url(team_link.attrs["href"].rstrip("/draft.html")))
         return PlayerInDraft(player=player, team=team, pick=pick, college=college, years_in_league=years)
@@ -3,13 +3,13 @@ from datetime import datetime
 
 from bballer.models.game import Game, CondensedGamelog
 from bballer.models.team import TeamShell
-from bballer.scrapers.base import Scraper, get_data_stat_in_element
+from bballer.scrapers.base import Scraper, DataStatRow
 from bballer.scrapers.utilities import remove_year_from_team_url
 
 
 class GameScraper(Scraper):
-    def __init__(self, url: str):
-        super().__init__(url)
+    def __init__(self, url: str, content: bytes = None):
+        super().__init__(url, content)
 
     def get_content(self):
         game = Game()
@@ -19,7 +19,7 @@ class GameScraper(Scraper):
         game.date = self.find_date()
         game.score_by_quarter = self.find_score_by_quarter()
         game.statlines = self.find_statlines()
-        return game
+        return self._detach(game)
 
     def find_score(self):
         scores = self.find_all("div", class_="score")
@@ -58,27 +58,14 @@ class GameScraper(Scraper):
         return [[self.parse_row(row) for row in sublist] for sublist in rows]
 
     def parse_row(self, row):
+        stats = DataStatRow(row)
         gl = CondensedGamelog()
 
-        gl.player_id = get_data_stat_in_element("player", row, "data-append-csv")
-        if get_data_stat_in_element("reason", row):
+        CondensedGamelog.columns.fill(gl, stats)
+        if stats.get("reason"):
             gl.played = False
             return gl
-        gl.seconds_played = get_data_stat_in_element("mp", row, "csk")
-        gl.defensive_rebounds = get_data_stat_in_element("drb", row)
-        gl.offensive_rebounds = get_data_stat_in_element("orb", row)
-        gl.ft_attempted = get_data_stat_in_element("fta", row)
-        gl.ft_made = get_data_stat_in_element("ft", row)
-        gl.fg_made = get_data_stat_in_element("fg", row)
-        gl.fg_attempted = get_data_stat_in_element("fga", row)
-        gl.three_fg_attempted = get_data_stat_in_element("fg3a", row)
-        gl.three_fg_made = get_data_stat_in_element("fg3", row)
-        gl.assists = get_data_stat_in_element("ast", row)
-        gl.steals = get_data_stat_in_element("stl", row)
-        gl.turnovers = get_data_stat_in_element("tov", row)
-        gl.fouls = get_data_stat_in_element("pf", row)
-        gl.points = get_data_stat_in_element("pts", row)
-        gl.plus_minus = get_data_stat_in_element("plus_minus", row)
+        CondensedGamelog.box_score_columns.fill(gl, stats)
         gl.played = True
         gl.started = len([sibling for sibling in list(row.previous_siblings) if sibling.name == "tr"]) < 5
         return gl
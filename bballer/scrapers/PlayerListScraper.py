@@ -1,12 +1,16 @@
+from bs4 import SoupStrainer
+
 from bballer.scrapers.base import Scraper
 
 
 class PlayerListScraper(Scraper):
+    regions = (SoupStrainer("table", id="players"),)
+
     def get_content(self):
         return self.get_player_urls()
 
-    def __init__(self, url: str):
-        super().__init__(url)
+    def __init__(self, url: str, content: bytes = None):
+        super().__init__(url, content)
 
     def get_player_urls(self):
         cells = self._parsed.find_all("th", {"data-stat": "player", "scope": "row"})
@@ -2,15 +2,20 @@ import logging
 import os
 import re
 from datetime import date
-from typing import List, Optional
+from threading import Lock
+from typing import List, Optional, Dict, Callable, Iterable, Tuple, Any
 
 from bballer.models.advanced_stats import AdvancedStatLine
+from bballer.models.lazy import LazySequence
 from bballer.models.player import Salary, Contract, ContractYear, DraftPick, Player
 from bballer.models.stats import StatLine, PlayoffStatLine, ShootingStatLine, ShootingByDistance, SeasonStatLine
 from bballer.models.team import TeamShell
-from bballer.scrapers.base import Scraper, get_data_stat_in_element
+from bballer.scrapers.base import Scraper, DataStatRow
 from bballer.scrapers.utilities import to_absolute_url
 
+REG_SEASON_TABLE_ID = "totals"
+PLAYOFF_TABLE_ID = "playoffs_totals"
+
 
 def _get_contract_option(classes: List) -> Optional[str]:
     if not classes:
@@ -24,33 +29,77 @@ def _get_contract_option(classes: List) -> Optional[str]:
     return None
 
 
-def _should_parse_row(row):
-    return get_data_stat_in_element("lg_id", row) == "NBA"
+def _should_parse_row(stats: DataStatRow):
+    return stats.get("lg_id") == "NBA"
 
 
-class PlayerPageScraper(Scraper):
+class SeasonIndex:
+    """
+    The rows of a table by season, and by season and team, built in a single pass over the table so that joining
+    its rows to those of another table is a dictionary lookup.
+    """
 
-    def get_content(self):
-        return self.player()
+    def __init__(self, rows: Iterable[DataStatRow], season_of: Callable[[DataStatRow], int]):
+        self._by_season: Dict[int, DataStatRow] = {}
+        self._by_season_and_team: Dict[Tuple[int, str], DataStatRow] = {}
+        for row in rows:
+            season = season_of(row)
+            self._by_season.setdefault(season, row)
+            self._by_season_and_team.setdefault((season, row.get("team_id")), row)
+
+    def get(self, season: int, team: str = None) -> Optional[DataStatRow]:
+        """Returns the first row for {team} in {season}, or else the first row in {season} (players who were traded
+        have a row for each of their teams, and one for the whole season)."""
+        return self._by_season_and_team.get((season, team)) or self._by_season.get(season)
 
-    def __init__(self, url: str):
-        super().__init__(url)
-        self._reg_season_table = self.get_commented_table_with_id("totals")
-        self._playoff_table = self.get_commented_table_with_id("playoffs_totals")
-        self._advanced_table = self.get_commented_table_with_id("advanced")
 
-    def player(self) -> Player:
+class PlayerPageScraper(Scraper):
+
+    def get_content(self):
+        return self._detach(self.player())
+
+    def __init__(self, url: str, content: bytes = None):
+        super().__init__(url, content)
+        self._advanced_index: Optional[SeasonIndex] = None
+        self._totals_rows: Dict[str, List[DataStatRow]] = {}
+        self._shooting_scrapers: Dict[str, ShootingDataScraper] = {}
+        self._lock = Lock()
+
+    def release(self):
+        super().release()
+        self._advanced_index = None
+        self._totals_rows = {}
+        self._shooting_scrapers = {}
+
+    @property
+    def _reg_season_table(self):
+        return self.get_commented_table_with_id(REG_SEASON_TABLE_ID)
+
+    @property
+    def _playoff_table(self):
+        return self.get_commented_table_with_id(PLAYOFF_TABLE_ID)
+
+    @property
+    def _advanced_table(self):
+        return self.get_commented_table_with_id("advanced")
+
+    def player(self, lazy: bool = False) -> Player:
+        """
+        @param lazy: if True, each section of the player (its seasons, salaries, draft pick...) is only parsed when it
+        is first accessed, see Player.lazy and Player.materialize.
+        """
+        if lazy:
+            return Player.lazy(self._get_id(), self._load_section)
         id_ = self._get_id()
         name = self._get_name()
-        playoffs = self._get_playoffs_totals()
+        playoffs = LazySequence(self._get_playoffs_totals())
         college = self._get_college()
         date_of_birth = self._get_dob()
         career_stats = self._get_career_stats()
         height, weight = self._get_physical()
         draft_pick = self._get_draft_pick()
-        positions = [s.stats.position for s in list(self._get_regular_season_totals())]
-        position = max(positions, key=positions.count) if positions else None
-        seasons = self._get_regular_season_totals()  # recalculate to reset the generator
+        position = self._get_position()
+        seasons = LazySequence(self._get_regular_season_totals())
         shooting_hand = self._get_shooting_hand()
         salaries = self._get_salaries()
         contract = self._get_contract()
@@ -60,6 +109,27 @@ class PlayerPageScraper(Scraper):
                       career_stats=career_stats, _height=height, _weight=weight, draft_pick=draft_pick,
                       position=position, shooting_hand=shooting_hand, salaries=salaries, contract=contract)
 
+    def _load_section(self, field: str) -> Dict[str, Any]:
+        """Parses the section of the page {field} of a lazy player comes from, returns the fields it fills in."""
+        with self._lock:
+            if field in ("_height", "_weight"):
+                height, weight = self._get_physical()
+                return {"_height": height, "_weight": weight}
+            loaders = {
+                "name": self._get_name,
+                "date_of_birth": self._get_dob,
+                "college": self._get_college,
+                "position": self._get_position,
+                "seasons": lambda: LazySequence(self._get_regular_season_totals()),
+                "playoffs": lambda: LazySequence(self._get_playoffs_totals()),
+                "career_stats": self._get_career_stats,
+                "draft_pick": self._get_draft_pick,
+                "shooting_hand": self._get_shooting_hand,
+                "contract": self._get_contract,
+                "salaries": self._get_salaries,
+            }
+            return {field: loaders[field]()}
+
     def _get_id(self):
         if os.path.isfile(self._url):
             return os.path.split(self._url)[-1].rstrip(".html")
@@ -79,10 +149,14 @@ class PlayerPageScraper(Scraper):
     def _get_name(self) -> str:
         return self.get_item_prop("name", element="h1")
 
+    def _get_position(self):
+        positions = [stats.get("pos") for stats in self._get_totals_rows(REG_SEASON_TABLE_ID)]
+        return max(positions, key=positions.count) if positions else None
+
     def _get_career_stats(self):
         if self._reg_season_table:
-            career_row = self._reg_season_table.find("th", string="Career").find_parent("tr")
-            return self._parse_stats_from_row(career_row, StatLine)
+            career_row = DataStatRow(self._reg_season_table.find("th", string="Career").find_parent("tr"))
+            return self._parse_stats_from_row(career_row, StatLine, self._get_season_from_row(career_row))
 
     def _get_college(self):
         preceding_element = self._parsed.find("strong", text=re.compile("College:"))
@@ -90,108 +164,65 @@ class PlayerPageScraper(Scraper):
             return preceding_element.find_next_sibling("a").text
 
     def _get_regular_season_totals(self):
-        for el in self._get_totals(self._reg_season_table):
+        for el in self._get_totals(REG_SEASON_TABLE_ID):
             yield el
 
     def _get_playoffs_totals(self):
-        for el in self._get_totals(self._playoff_table, PlayoffStatLine):
+        for el in self._get_totals(PLAYOFF_TABLE_ID, PlayoffStatLine):
             yield el
 
-    def _get_totals(self, table, statline_type=SeasonStatLine):
-        if not table:
-            yield None
-        rows = table.find_all("tr", class_="full_table")
-        for row in [row for row in rows if _should_parse_row(row)]:
-            statline = self._parse_stats_from_row(row, statline_type)
-            yield self.wrap_statline(statline, statline_type, row)
-
-    def wrap_statline(self, statline, statline_type, row):
-        season = self._get_season_from_row(row)
-        age = get_data_stat_in_element("age", row)
-        team = get_data_stat_in_element("team_id", row)
-        all_star = bool(row.find("span", class_="sr_star"))
+    def _get_totals(self, table_id: str, statline_type=SeasonStatLine):
+        for stats in self._get_totals_rows(table_id):
+            season = self._get_season_from_row(stats)
+            statline = self._parse_stats_from_row(stats, statline_type, season)
+            yield self.wrap_statline(statline, statline_type, stats, season)
+
+    def _get_totals_rows(self, table_id: str) -> List[DataStatRow]:
+        """Returns the rows of the totals table with {table_id} which are parsed into seasons, only decoding them once
+        per table."""
+        if table_id not in self._totals_rows:
+            table = self.get_commented_table_with_id(table_id)
+            rows = [DataStatRow(row) for row in table.find_all("tr", class_="full_table")] if table else []
+            self._totals_rows[table_id] = [stats for stats in rows if _should_parse_row(stats)]
+        return self._totals_rows[table_id]
+
+    def wrap_statline(self, statline, statline_type, stats: DataStatRow, season: int):
+        age = stats.get("age")
+        team = stats.get("team_id")
+        all_star = bool(stats.row.find("span", class_="sr_star"))
         return statline_type(stats=statline, season=season, age=age, team=team, all_star=all_star,
                              _player_url=self._url)
 
-    def _parse_stats_from_row(self, row, statline_type):
-        season = self._get_season_from_row(row)
-        games_played = get_data_stat_in_element("g", row)
-        games_started = get_data_stat_in_element("gs", row)
-        minutes_played = get_data_stat_in_element("mp", row)
-        position = get_data_stat_in_element("pos", row)
-        fg_made = get_data_stat_in_element("fg", row)
-        fg_attempted = get_data_stat_in_element("fga", row)
-        three_fg_made = get_data_stat_in_element("fg3", row)
-        three_fg_attempted = get_data_stat_in_element("fg3a", row)
-        two_fg_made = get_data_stat_in_element("fg2", row)
-        two_fg_attempted = get_data_stat_in_element("fg2a", row)
-        effective_fg_percentage = get_data_stat_in_element("efg_pct", row)
-        free_throw_made = get_data_stat_in_element("ft", row)
-        free_throw_attempted = get_data_stat_in_element("fta", row)
-        offensive_rebounds = get_data_stat_in_element("orb", row)
-        defensive_rebounds = get_data_stat_in_element("drb", row)
-        assists = get_data_stat_in_element("ast", row)
-        steals = get_data_stat_in_element("stl", row)
-        blocks = get_data_stat_in_element("blk", row)
-        turnovers = get_data_stat_in_element("tov", row)
-        fouls = get_data_stat_in_element("pf", row)
-        points = get_data_stat_in_element("pts", row)
-        sl = ShootingDataScraper(self.get_commented_table_with_id(statline_type.shooting_data_table_id))
-        shooting_data = sl.get_shooting_data(self._get_season_from_row(row))
-        statline = StatLine(games_played=games_played,
-                            games_started=games_started,
-                            minutes_played=minutes_played,
-                            position=position, fg_made=fg_made, fg_attempted=fg_attempted,
-                            three_fg_made=three_fg_made,
-                            three_fg_attempted=three_fg_attempted, two_fg_made=two_fg_made,
-                            two_fg_attempted=two_fg_attempted, effective_fg_percentage=effective_fg_percentage,
-                            ft_made=free_throw_made, ft_attempted=free_throw_attempted,
-                            offensive_rebounds=offensive_rebounds, defensive_rebounds=defensive_rebounds,
-                            assists=assists, steals=steals, blocks=blocks, turnovers=turnovers, fouls=fouls,
-                            points=points, shooting_data=shooting_data)
+    def _parse_stats_from_row(self, stats: DataStatRow, statline_type, season: int):
+        shooting_data = self._get_shooting_scraper(statline_type.shooting_data_table_id).get_shooting_data(season)
+        statline = StatLine(**StatLine.columns.decode(stats), shooting_data=shooting_data)
 
         if season == 0:
             advanced_statline = self._advanced_table.find("tfoot").find("tr")
             if advanced_statline:
-                statline.advanced = self._parse_stats_from_advanced_row(advanced_statline)
+                statline.advanced = self._parse_stats_from_advanced_row(DataStatRow(advanced_statline))
 
         else:
-            advanced_statline_row = [tr for tr in self._advanced_table.find_all("tr", class_="full_table") if
-                                     self._get_season_from_row(tr) == season][0]
-            advanced_statline = self._parse_stats_from_advanced_row(advanced_statline_row)
-            statline.advanced = advanced_statline
+            advanced_statline_row = self._get_advanced_index().get(season, stats.get("team_id"))
+            statline.advanced = self._parse_stats_from_advanced_row(advanced_statline_row) \
+                if advanced_statline_row else None
 
         return statline
 
-    def _parse_stats_from_advanced_row(self, row):
-        season = self._get_season_from_row(row)
-        per = get_data_stat_in_element("per", row)
-        tsp = get_data_stat_in_element("ts_pct", row)
-        orb = get_data_stat_in_element("orb_pct", row)
-        tpar = get_data_stat_in_element("fg3a_per_fga_pct", row)
-        ftar = get_data_stat_in_element("fta_per_fga_pct", row)
-        drb = get_data_stat_in_element("drb_pct", row)
-        trb = get_data_stat_in_element("trb_pct", row)
-        astp = get_data_stat_in_element("ast_pct", row)
-        stlp = get_data_stat_in_element("stl_pct", row)
-        blkp = get_data_stat_in_element("blk_pct", row)
-        tovp = get_data_stat_in_element("tov_pct", row)
-        usgp = get_data_stat_in_element("usg_pct", row)
-        ows = get_data_stat_in_element("ows", row)
-        dws = get_data_stat_in_element("dws", row)
-        wsp48 = get_data_stat_in_element("ws_per_48", row)
-        obpm = get_data_stat_in_element("obpm", row)
-        dbpm = get_data_stat_in_element("dbpm", row)
-        vorp = get_data_stat_in_element("vorp", row)
-
-        return AdvancedStatLine(season=season, player_efficiency_rating=per, true_shooting_percentage=tsp,
-                                offensive_rebound_percentage=orb, defensive_rebound_percentage=drb,
-                                total_rebound_percentage=trb, assist_percentage=astp, steal_percentage=stlp,
-                                three_fg_attempt_rate=tpar, ft_attempt_rate=ftar,
-                                block_percentage=blkp, turnover_percentage=tovp, usage_percentage=usgp,
-                                offensive_win_shares=ows, defensive_win_shares=dws,
-                                win_shares_per_48=wsp48, offensive_box_plus_minus=obpm, defensive_box_plus_minus=dbpm,
-                                value_over_replacement_player=vorp)
+    def _get_advanced_index(self) -> SeasonIndex:
+        if self._advanced_index is None:
+            rows = [DataStatRow(tr) for tr in self._advanced_table.find_all("tr", class_="full_table")]
+            self._advanced_index = SeasonIndex(rows, self._get_season_from_row)
+        return self._advanced_index
+
+    def _get_shooting_scraper(self, table_id: str) -> "ShootingDataScraper":
+        if table_id not in self._shooting_scrapers:
+            self._shooting_scrapers[table_id] = ShootingDataScraper(self.get_commented_table_with_id(table_id))
+        return self._shooting_scrapers[table_id]
+
+    def _parse_stats_from_advanced_row(self, stats: DataStatRow):
+        season = self._get_season_from_row(stats)
+        return AdvancedStatLine(season=season, **AdvancedStatLine.columns.decode(stats))
 
     def _get_dob(self):
         date_str = self.get_item_prop("birthDate", attr="data-birth")
@@ -214,8 +245,8 @@ class PlayerPageScraper(Scraper):
     def _get_shooting_hand(self) -> str:
         return self.get_first_text_sibling("strong", "Shoots:")
 
-    def _get_season_from_row(self, row):
-        s = get_data_stat_in_element("season", row)
+    def _get_season_from_row(self, stats: DataStatRow):
+        s = stats.get("season")
         return 0 if "Career" in s else int(s[0:4]) + 1
 
     def _get_salaries(self):
@@ -224,10 +255,11 @@ class PlayerPageScraper(Scraper):
             return []
         salaries = []
         for row in table.find("tbody").find_all("tr"):
-            season = get_data_stat_in_element("season", row)
-            team = get_data_stat_in_element("team_name", row, return_first_child=True)["href"]
+            stats = DataStatRow(row)
+            season = stats.get("season")
+            team = stats.get("team_name", return_first_child=True)["href"]
             team_url = to_absolute_url(team)
-            amount = int(get_data_stat_in_element("salary", row, "csk"))
+            amount = int(stats.get("salary", "csk"))
             salaries.append(Salary(season=season, team=team_url, amount=amount))
         return salaries
 
@@ -257,6 +289,12 @@ class PlayerPageScraper(Scraper):
 class ShootingDataScraper:
     def __init__(self, table):
         self.table = table
+        self._rows: Dict[int, object] = {}
+        # season -> the first row whose id ends in that season, e.g. "shooting.2004"
+        for row in table.find_all("tr", id=True) if table else []:
+            season = re.search(r"(\d+)$", row.attrs["id"])
+            if season:
+                self._rows.setdefault(int(season.group(1)), row)
 
     def get_shooting_data(self, season):
         table = self.table
@@ -265,40 +303,14 @@ class ShootingDataScraper:
         if season == 0:  # Career stats
             row = table.find("tfoot").find("tr")
         else:
-            row = table.find("tr", id=re.compile(f"{season}$"))
+            row = self._rows.get(season)
             if not row:
                 return None
         return self._parse_stats_from_shooting_row(row)
 
     def _parse_stats_from_shooting_row(self, row):
-        sd = ShootingStatLine()
-        sd.fga_by_distance = self.get_fga_by_distance(row)
-        sd.fgp_by_distance = self.get_fgp_by_distance(row)
-        sd.avg_distance = get_data_stat_in_element("avg_dist", row)
-        sd.two_point_fga_assisted = get_data_stat_in_element("fg2_pct_ast", row)
-        sd.dunks_fga = get_data_stat_in_element("pct_fg2_dunk", row)
-        sd.dunks_made = get_data_stat_in_element("fg2_dunk", row)
-        sd.three_point_fga_assisted = get_data_stat_in_element("fg3_pct_ast", row)
-        sd.corner_three_point_fga = get_data_stat_in_element("pct_fg3a_corner", row)
-        sd.corner_three_point_fgp = get_data_stat_in_element("fg3_pct_corner", row)
-        sd.heaves_attempted = get_data_stat_in_element("fg3a_heave", row)
-        sd.heaves_made = get_data_stat_in_element("fg3_heave", row)
+        stats = DataStatRow(row)
+        sd = ShootingStatLine.columns.fill(ShootingStatLine(), stats)
+        sd.fga_by_distance = ShootingByDistance(**ShootingByDistance.fga_columns.decode(stats))
+        sd.fgp_by_distance = ShootingByDistance(**ShootingByDistance.fgp_columns.decode(stats))
         return sd
-
-    def get_fga_by_distance(self, row):
-        two_point = get_data_stat_in_element("fg2a_pct_fga", row)
-        zero_three = get_data_stat_in_element("pct_fga_00_03", row)
-        three_ten = get_data_stat_in_element("pct_fga_03_10", row)
-        ten_sixteen = get_data_stat_in_element("pct_fga_10_16", row)
-        sixteen_xx = get_data_stat_in_element("pct_fga_16_xx", row)
-        three_point = get_data_stat_in_element("fg3a_pct_fga", row)
-        return ShootingByDistance(two_point, zero_three, three_ten, ten_sixteen, sixteen_xx, three_point)
-
-    def get_fgp_by_distance(self, row):
-        two_point = get_data_stat_in_element("fg2_pct", row)
-        zero_three = get_data_stat_in_element("fg_pct_00_03", row)
-        three_ten = get_data_stat_in_element("fg_pct_03_10", row)
-        ten_sixteen = get_data_stat_in_element("fg_pct_10_16", row)
-        sixteen_xx = get_data_stat_in_element("fg_pct_16_xx", row)
-        three_point = get_data_stat_in_element("fg3_pct", row)
-        return ShootingByDistance(two_point, zero_three, three_ten, ten_sixteen, sixteen_xx, three_point)
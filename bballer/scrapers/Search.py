@@ -1,12 +1,16 @@
 from typing import List, Tuple
 
+from bs4 import SoupStrainer
+
 from bballer.scrapers.base import Scraper
 
 
 class SearchPageScraper(Scraper):
+    # the results, or the player page the search redirected to
+    regions = (SoupStrainer("div", id=["info", "players", "teams"]), SoupStrainer("link", rel="canonical"))
 
-    def __init__(self, url: str):
-        super().__init__(url)
+    def __init__(self, url: str, content: bytes = None):
+        super().__init__(url, content)
 
     def get_content(self):
         # Returns all search results, use get_results_in_table to specify table id (e.g. players or teams)
@@ -1,19 +1,26 @@
 import re
 from typing import Tuple
 
+from bs4 import SoupStrainer
+
 from bballer.models.player import PlayerShell
 from bballer.models.team import Team, TeamSeason
-from bballer.scrapers.base import Scraper, get_data_stat_in_element
+from bballer.scrapers.base import Scraper, DataStatRow, get_data_stat_in_element
 from bballer.scrapers.utilities import to_absolute_url
 
 
 class TeamSeasonScraper(Scraper):
+    regions = (SoupStrainer("table", id="roster"),)
+
     def get_content(self):
         return self.get_roster()
 
-    def __init__(self, code, year):
-        url = f"https://www.basketball-reference.com/teams/{code}/{year}.html"
-        super().__init__(url)
+    def __init__(self, code, year, content: bytes = None):
+        super().__init__(self.get_url(code, year), content)
+
+    @staticmethod
+    def get_url(code, year) -> str:
+        return f"https://www.basketball-reference.com/teams/{code}/{year}.html"
 
     def get_roster(self):
         table = self.find("table", id="roster")
@@ -24,14 +31,21 @@ class TeamSeasonScraper(Scraper):
 
 class TeamPageScraper(Scraper):
     def get_content(self):
-        return self.team()
+        return self._detach(self.team())
 
-    def __init__(self, code_or_url: str):
+    def __init__(self, code_or_url: str, content: bytes = None):
         code_is_url = len(code_or_url) > 3
-        url = code_or_url if code_is_url else f"https://www.basketball-reference.com/teams/{code_or_url}/"
         self.code = code_or_url if not code_is_url else None
-        super().__init__(url)
-        self._team_table = self.find("table", id=self._get_code())
+        super().__init__(self.get_url(code_or_url), content)
+        self._team_table = self.get_table_with_id(self._get_code())
+
+    def release(self):
+        super().release()
+        self._team_table = None
+
+    @staticmethod
+    def get_url(code_or_url: str) -> str:
+        return code_or_url if len(code_or_url) > 3 else f"https://www.basketball-reference.com/teams/{code_or_url}/"
 
     def team(self) -> Team:
         name = self._get_name()
@@ -57,20 +71,11 @@ class TeamPageScraper(Scraper):
         return list(reversed([self.parse_team_row(row) for row in rows]))
 
     def parse_team_row(self, row):
-        season = get_data_stat_in_element("season", row)
-        wins = get_data_stat_in_element("wins", row)
-        losses = get_data_stat_in_element("losses", row)
-        pace = get_data_stat_in_element("pace", row)
-        rel_pace = get_data_stat_in_element("pace_rel", row)
-        off_rtg = get_data_stat_in_element("off_rtg", row)
-        off_rtg_rel = get_data_stat_in_element("off_rtg_rel", row)
-        def_rtg = get_data_stat_in_element("def_rtg", row)
-        def_rtg_rel = get_data_stat_in_element("def_rtg_rel", row)
-        playoff_result = self._get_playoff_result_from_row(row)
+        stats = DataStatRow(row)
+        playoff_result = self._get_playoff_result_from_row(stats)
         won_championship = playoff_result.lower() == "Won Finals".lower()
         made_playoffs = bool(playoff_result)
-        return TeamSeason(season=season, wins=wins, losses=losses, pace=pace, rel_pace=rel_pace, rel_drtg=def_rtg_rel,
-                          rel_ortg=off_rtg_rel, ortg=off_rtg, drtg=def_rtg, made_playoffs=made_playoffs,
+        return TeamSeason(**TeamSeason.columns.decode(stats), made_playoffs=made_playoffs,
                           won_championship=won_championship, playoff_result=playoff_result, _team_code=self._get_code())
 
     def _get_code(self):
@@ -79,6 +84,6 @@ class TeamPageScraper(Scraper):
             self.code = url.split("/")[-2]
         return self.code
 
-    def _get_playoff_result_from_row(self, row):
-        td = row.find("td", attrs={"data-stat": "rank_team_playoffs"})
+    def _get_playoff_result_from_row(self, stats: DataStatRow):
+        td = stats.cell("rank_team_playoffs")
         return td.find("strong").text if td.find("strong") else td.text
@@ -1,10 +1,43 @@
+import asyncio
 import logging
 import os
 import re
+import types
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import Callable, TypeVar, Dict, List, Optional, Tuple
 
-from bs4 import BeautifulSoup, NavigableString, Comment
+from bs4 import BeautifulSoup, NavigableString, Comment, Tag, SoupStrainer
+from bs4.builder import builder_registry
 
 from bballer.scrapers.download import Download
+from bballer.scrapers.schema import to_number
+from bballer.scrapers.tables import TableIndex
+
+T = TypeVar("T")
+
+COMMENTED_TABLE_ID = re.compile(r'<table\b[^>]*?\sid="([^"]+)"')
+PARSERS = ("lxml", "html5lib", "html.parser")
+# the tree builders BeautifulSoup can use, fastest first. html.parser is part of Python, the others are optional.
+DEFAULT_PARSER = "html.parser"
+# the parser used unless another one is chosen with Scraper.set_parser, the one every scraper is tested with
+
+
+@lru_cache(maxsize=None)
+def resolve_parser(parser: str = None) -> str:
+    """
+    Returns {parser} if it is installed, otherwise the fastest parser which is.
+    @param parser: one of PARSERS, or None for DEFAULT_PARSER.
+    """
+    if parser is None:
+        return DEFAULT_PARSER
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser {parser}, expected one of {PARSERS}.")
+    if builder_registry.lookup(parser) is None:
+        fallback = next(p for p in PARSERS if builder_registry.lookup(p) is not None)
+        logging.warning(f"Parser {parser} is not installed, using {fallback} instead")
+        return fallback
+    return parser
 
 
 def get_data_stat_child(stat_name, container):
@@ -28,7 +61,10 @@ def get_data_stat_in_element(stat_name, element, attr=None, return_first_child=F
     """
     if attr and return_first_child:
         raise ValueError("Arguments attr and return_first_child are mutually exclusive.")
-    val = element.find(attrs={"data-stat": stat_name})
+    return _data_stat_value(element.find(attrs={"data-stat": stat_name}), attr, return_first_child)
+
+
+def _data_stat_value(val, attr=None, return_first_child=False):
     if not val:
         return None
     if attr:
@@ -36,33 +72,244 @@ def get_data_stat_in_element(stat_name, element, attr=None, return_first_child=F
     elif return_first_child:
         return val.find()
     else:
-        val = val.text if not val.find("a") else val.find("a").text
-    try:
+        val = _cell_text(val)
+    if not val:
+        return None
+    return to_number(val) if isinstance(val, str) else val
+
+
+def _cell_text(cell) -> str:
+    """Returns the text of the link in {cell} if there is one, e.g. the team of a season, or else the cell's text."""
+    link = cell.find("a")
+    return link.text if link else cell.text
+
+
+class DataStatRow:
+    """
+    The cells of a table row by their "data-stat" attribute, collected in a single pass over the row, so that reading
+    every column doesn't search the row again for each of them. Values are converted like get_data_stat_in_element does.
+    """
+
+    def __init__(self, row):
+        self.row = row
+        self._cells: Dict[str, Tag] = {}
+        for cell in row.find_all(attrs={"data-stat": True}):
+            # like find, the first cell with a given data-stat wins
+            self._cells.setdefault(cell.attrs["data-stat"], cell)
+
+    def cell(self, stat_name) -> Optional[Tag]:
+        return self._cells.get(stat_name)
+
+    def get(self, stat_name, attr=None, return_first_child=False):
+        """Same as get_data_stat_in_element(stat_name, row, attr, return_first_child)."""
+        if attr and return_first_child:
+            raise ValueError("Arguments attr and return_first_child are mutually exclusive.")
+        return _data_stat_value(self._cells.get(stat_name), attr, return_first_child)
+
+    def text(self, stat_name, attr=None) -> Optional[str]:
+        """Returns the text of a cell, or the value of its attribute {attr}, unconverted. None if there's no cell."""
+        cell = self._cells.get(stat_name)
+        if cell is None:
+            return None
+        return cell.attrs.get(attr) if attr else _cell_text(cell)
+
+    def child(self, stat_name):
+        """Same as get_data_stat_child(stat_name, row)."""
+        val = self._cells.get(stat_name)
         if not val:
             return None
-        if "." in val:
-            return float(val)
-        return int(val)
-    except ValueError:
-        return val
+        return val.find()
+
+
+class AnyRegion(SoupStrainer):
+    """
+    Keeps every part of a page matched by one of {strainers}, where BeautifulSoup only takes a single SoupStrainer.
+    """
+
+    def __init__(self, *strainers: SoupStrainer):
+        super().__init__()
+        self.strainers = strainers
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return any(s.allow_tag_creation(nsprefix, name, attrs) for s in self.strainers)
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    def search_tag(self, markup_name=None, markup_attrs=None):
+        # what Beautiful Soup before 4.13 calls instead of allow_tag_creation
+        return any(s.search_tag(markup_name, markup_attrs or {}) for s in self.strainers)
+
+
+class CommentedTables:
+    """
+    Index of the tables which are embedded in the HTML comments of a page, built in a single pass over the comments.
+    A comment is only parsed once one of its tables is asked for, and only once.
+    """
+
+    def __init__(self, document, parse: Callable[[str], BeautifulSoup]):
+        """
+        @param document: the parsed page.
+        @param parse: parses the markup in a comment.
+        """
+        self._parse = parse
+        self._comments: List[Comment] = []
+        self._ids: Dict[str, int] = {}
+        # table id -> index of the comment containing it, in document order
+        for comment in document.find_all(string=lambda x: isinstance(x, Comment)):
+            ids = COMMENTED_TABLE_ID.findall(comment)
+            if ids:
+                for id_ in ids:
+                    self._ids.setdefault(id_, len(self._comments))
+                self._comments.append(comment)
+        self._parsed: Dict[int, BeautifulSoup] = {}
+        self._tables: Dict[str, Tag] = {}
+
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def get(self, id_regex) -> Optional[Tag]:
+        """Returns the first table whose id fully matches the regular expression {id_regex}, or None."""
+        pattern = re.compile(id_regex)
+        for id_ in self._ids:
+            if pattern.fullmatch(id_):
+                return self._table(id_)
+        return None
+
+    def _table(self, id_: str):
+        if id_ not in self._tables:
+            index = self._ids[id_]
+            if index not in self._parsed:
+                self._parsed[index] = self._parse(self._comments[index])
+            self._tables[id_] = self._parsed[index].find("table", id=id_)
+        return self._tables[id_]
+
+
+def materialize(content):
+    """Returns {content} with nothing left to parse: generators are turned into lists, models are materialized."""
+    if isinstance(content, types.GeneratorType):
+        return [materialize(item) for item in content]
+    if hasattr(content, "materialize"):
+        return content.materialize()
+    return content
+
+
+async def scrape_async(url: str, parse: Callable[[bytes], T], executor: Executor = None) -> T:
+    """
+    Downloads {url} without blocking the event loop, then parses it in the loop's default executor.
+    @param url: the URL or path of the page.
+    @param parse: turns the downloaded page into the result, typically by calling get_content on a new scraper.
+    @param executor: if specified, the executor {parse} runs in instead. For a ProcessPoolExecutor, {parse} and its
+    result have to be picklable.
+    @return: the result of {parse}.
+    """
+    async with Download.async_session():
+        content = await Download.download_async(url) if url.startswith("http") else None
+    return await asyncio.get_running_loop().run_in_executor(executor, parse, content)
 
 
 class Scraper:
     """
     Base class for each scraper.
     """
+    parser = None
+    # the parser backend, see set_parser
+    regions: Tuple[SoupStrainer, ...] = ()
+    # the parts of the page the scraper reads, nothing else is parsed. Empty means the whole page.
+    fast_tables = False
+    # whether tables are extracted straight from the page instead of its parse tree, see use_fast_tables
+    detached = False
+    # whether get_content returns fully built models and releases the page, see use_detached
+    _commented_tables: CommentedTables = None
+    _tables: TableIndex = None
+    _released = False
 
-    def __init__(self, url: str):
+    def __init__(self, url: str, content: bytes = None):
+        """
+        @param url: the URL or path of the page.
+        @param content: the page itself, if it has already been downloaded.
+        """
         self._url = url
-        self._parsed = self._get_page()
+        if self.fast_tables:
+            # the parse tree is only built if something other than a table is needed
+            self._page = content if content is not None else self._get_content()
+            self._tree = None
+        else:
+            self._tree = self._get_page(content)
         logging.debug(f"Scraping {url}")
 
+    @property
+    def _parsed(self) -> BeautifulSoup:
+        if self._released:
+            raise ValueError(f"The page of {self._url} has been released")
+        if self._tree is None:
+            self._tree = self._get_page(self._page)
+        return self._tree
+
+    def release(self):
+        """
+        Lets go of the page, its parse tree and every table found in it, so that they can be garbage collected even if
+        the scraper is kept. The scraper can't read the page anymore afterwards.
+        """
+        self._page = self._tree = None
+        self._commented_tables = self._tables = None
+        self._released = True
+
+    def _detach(self, content):
+        """Returns {content}, or in detached mode, {content} materialized after which the page is released."""
+        if not self.detached:
+            return content
+        content = materialize(content)
+        self.release()
+        return content
+
     def get_content(self):
         raise NotImplementedError
 
-    def _get_page(self):
-        content = self._get_content()
-        return BeautifulSoup(content, features="html.parser")
+    @classmethod
+    def set_parser(cls, parser: str = None):
+        """
+        Sets the parser backend used by this scraper and its subclasses, e.g. Scraper.set_parser("html5lib") for every
+        scraper, or PlayerPageScraper.set_parser("lxml") for player pages only. A parser which is not installed is
+        replaced by the fastest one which is.
+        @param parser: one of PARSERS, or None to undo an earlier call, going back to the parser of the parent class
+        (for Scraper itself, DEFAULT_PARSER).
+        """
+        resolve_parser(parser)  # fail early on unknown names
+        if parser is None and cls is not Scraper:
+            if "parser" in vars(cls):
+                delattr(cls, "parser")
+        else:
+            cls.parser = parser
+
+    @classmethod
+    def use_fast_tables(cls, enabled: bool = True):
+        """
+        Lets this scraper and its subclasses extract tables by scanning the page, without building a BeautifulSoup
+        tree for the page or the comments the tables are embedded in. Only the scrapers which look up their tables
+        with get_table_with_id and get_commented_table_with_id benefit from this: PlayerPageScraper, GameLogScraper,
+        DraftPageScraper, TotalMinutesScraper and TeamPageScraper.
+        """
+        cls.fast_tables = enabled
+
+    @classmethod
+    def use_detached(cls, enabled: bool = True):
+        """
+        Makes get_content of this scraper and its subclasses return models which are fully built, e.g. players with
+        all of their seasons parsed and lists instead of generators, and release the page once they are. Models
+        which are kept around then no longer keep the page and its parse tree alive, which matters when keeping
+        many of them, e.g. every player of a season.
+        """
+        cls.detached = enabled
+
+    def _soup(self, markup, parse_only: SoupStrainer = None) -> BeautifulSoup:
+        return BeautifulSoup(markup, features=resolve_parser(self.parser), parse_only=parse_only)
+
+    def _get_page(self, content: bytes = None):
+        if content is None:
+            content = self._get_content()
+        regions = self.regions if resolve_parser(self.parser) != "html5lib" else ()  # html5lib parses everything
+        return self._soup(content, regions[0] if len(regions) == 1 else AnyRegion(*regions) if regions else None)
 
     def find(self, element, **kwargs):
         return self._parsed.find(element, **kwargs)
@@ -114,11 +361,28 @@ class Scraper:
         """
         Find table element embedded in an HTML comment.
         @param id_regex: a regular expression matching the id of the table element.
-        @return: the table element
+        @return: the first matching table in the document, or None. The same element is returned on every call.
         """
         # tables are embedded as comments in the document, so we have to fish
-        comment = self._parsed.find(string=lambda x: isinstance(x, Comment) and re.search(f"id=\"{id_regex}\"", x))
-        if not comment:
-            return
-        parsed = BeautifulSoup(comment, features="html.parser")
-        return parsed.find("table", id=re.compile(id_regex))
+        if self.fast_tables:
+            return self._table_index().get(id_regex, commented=True)
+        if self._commented_tables is None:
+            self._commented_tables = CommentedTables(self._parsed, self._soup)
+        return self._commented_tables.get(id_regex)
+
+    def get_table_with_id(self, table_id: str):
+        """
+        Finds a table element which is part of the page, i.e. not embedded in a comment.
+        @param table_id: the id of the table element.
+        @return: the table element or None.
+        """
+        if self.fast_tables:
+            return self._table_index().get(re.escape(table_id))
+        return self._parsed.find("table", id=table_id)
+
+    def _table_index(self) -> TableIndex:
+        if self._released:
+            raise ValueError(f"The page of {self._url} has been released")
+        if self._tables is None:
+            self._tables = TableIndex(self._page)
+        return self._tables
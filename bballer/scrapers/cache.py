@@ -0,0 +1,257 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, List, Tuple, Callable, Dict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+NEVER = None
+# A time-to-live of NEVER means an entry never expires.
+DEFAULT_TTL_SECS = 6 * 60 * 60
+
+COMPRESSION_LEVEL = 6
+# Pages are kept zlib-compressed in memory and on disk, HTML shrinks to about a tenth of its size.
+
+MEMORY_CACHE_BYTES = 64 * 1024 * 1024
+# Budget for the compressed pages kept in memory, which fits about a thousand player pages.
+EXCLUDE_FROM_MEMORY = [r"/search/"]
+# Pages matching these patterns are never kept in memory.
+
+TTL_RULES: List[Tuple[str, Optional[int]]] = [
+    (r"/search/", 0),  # search results are cheap and volatile, don't keep them
+    (r"/boxscores/", NEVER),  # a box score does not change once it is published
+]
+
+
+def compress(content: bytes) -> bytes:
+    return zlib.compress(content, COMPRESSION_LEVEL)
+
+
+def decompress(body: bytes) -> bytes:
+    return zlib.decompress(body)
+
+
+def normalize_url(url: str) -> str:
+    """Returns a canonical form of {url}, so that equivalent URLs share a cache entry."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def current_season(today: date = None) -> int:
+    # seasons are named after the year in which they end, and they start in October
+    today = today or date.today()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def season_from_url(url: str) -> Optional[int]:
+    # "/players/m/mbengdj01/gamelog/2008", "/leagues/NBA_2000_totals.html", "/teams/CLE/2016.html"
+    match = re.search(r"(?:NBA_|/)(\d{4})(?:[_./]|$)", urlsplit(url).path)
+    return int(match.group(1)) if match else None
+
+
+def ttl_for(url: str) -> Optional[int]:
+    """Returns the number of seconds a page may be cached, or NEVER if it does not expire.
+    Pages belonging to a finished season never expire, everything else expires after DEFAULT_TTL_SECS."""
+    for pattern, ttl in TTL_RULES:
+        if re.search(pattern, url):
+            return ttl
+    season = season_from_url(url)
+    if season and season < current_season():
+        return NEVER
+    return DEFAULT_TTL_SECS
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    # the compressed content
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def content(self) -> bytes:
+        return decompress(self.body)
+
+    def is_fresh(self, ttl: Optional[int]) -> bool:
+        if ttl is NEVER:
+            return True
+        return time.time() - self.fetched_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Returns the headers which ask the server to only send the page if it has changed since it was stored."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """
+    Persistent response cache. Each page is stored under the hash of its normalized URL, next to a small
+    metadata file which records when it was fetched.
+    """
+
+    def __init__(self, directory: str, ttl: Callable[[str], Optional[int]] = ttl_for):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[0:2], key)
+
+    def load(self, url: str) -> Optional[CacheEntry]:
+        """Returns the stored entry for {url}, whether it is still fresh or not."""
+        path = self._path(url)
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("encoding") != "zlib":
+            body = compress(body)  # stored before entries were compressed
+        return CacheEntry(url=meta["url"], body=body, fetched_at=meta["fetched_at"], etag=meta.get("etag"),
+                          last_modified=meta.get("last_modified"))
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Returns the stored content for {url}, or None if there is none or it has expired."""
+        entry = self.load(url)
+        if not entry:
+            return None
+        if not entry.is_fresh(self.ttl(url)):
+            logging.debug(f"Cache entry for {url} has expired")
+            return None
+        return entry.content
+
+    def set(self, url: str, content: bytes, etag: str = None, last_modified: str = None):
+        """Stores {content}, along with the validators the server sent for it."""
+        self.set_compressed(url, compress(content), etag, last_modified)
+
+    def set_compressed(self, url: str, body: bytes, etag: str = None, last_modified: str = None):
+        """Like set, but {body} has already been compressed."""
+        if self.ttl(url) == 0:
+            return
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to temporary files first so concurrent readers never see a half written entry
+        self._write(path, body)
+        self._write_meta(path, {"url": normalize_url(url), "fetched_at": time.time(), "etag": etag,
+                                "last_modified": last_modified, "encoding": "zlib"})
+
+    def touch(self, url: str):
+        """Marks the entry for {url} as freshly fetched, e.g. because the server said it has not changed."""
+        path = self._path(url)
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        meta["fetched_at"] = time.time()
+        self._write_meta(path, meta)
+
+    def _write_meta(self, path: str, meta: dict):
+        self._write(path + ".json", json.dumps(meta).encode("utf-8"))
+
+    def _write(self, path: str, data: bytes):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def clear(self):
+        for root, _, files in os.walk(self.directory):
+            for fn in files:
+                os.remove(os.path.join(root, fn))
+
+
+class MemoryCache:
+    """
+    In-memory cache of compressed pages, bounded by their total size rather than by their number.
+    @param max_bytes: the total size of the pages the cache may hold.
+    @param policy: "lru" evicts the least recently used page first, "lfu" the least frequently used one.
+    @param exclude: regular expressions matching URLs which are never cached.
+    """
+    POLICIES = ("lru", "lfu")
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_BYTES, policy: str = "lru", exclude: List[str] = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown eviction policy {policy}, use one of {', '.join(self.POLICIES)}.")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.exclude = [re.compile(pattern) for pattern in (EXCLUDE_FROM_MEMORY if exclude is None else exclude)]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._uses: Dict[str, int] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def admits(self, url: str, body: bytes) -> bool:
+        return len(body) <= self.max_bytes and not any([pattern.search(url) for pattern in self.exclude])
+
+    def get(self, url: str, ttl: Optional[int] = NEVER) -> Optional[bytes]:
+        """Returns the page cached for {url}, or None if there is none or it was fetched more than {ttl} seconds ago."""
+        with self._lock:
+            body = self._entries.get(url)
+            if body is None or (ttl is not NEVER and time.time() - self._fetched_at[url] >= ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(url)
+            self._uses[url] += 1
+            return body
+
+    def set(self, url: str, body: bytes, fetched_at: float = None):
+        """
+        Caches {body} for {url}, replacing the page cached for it before.
+        @param fetched_at: when the page was downloaded, now by default.
+        """
+        if not self.admits(url, body):
+            return
+        with self._lock:
+            if url in self._entries:
+                self.size -= len(self._entries.pop(url))
+            self._entries[url] = body
+            self._uses.setdefault(url, 1)
+            self._fetched_at[url] = time.time() if fetched_at is None else fetched_at
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        if self.policy == "lfu":
+            # entries are ordered from least to most recently used, so ties go to the least recent one
+            victim = min(self._entries, key=self._uses.__getitem__)
+        else:
+            victim = next(iter(self._entries))
+        self.size -= len(self._entries.pop(victim))
+        del self._uses[victim]
+        del self._fetched_at[victim]
+        self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._uses.clear()
+            self._fetched_at.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes}
@@ -1,42 +1,453 @@
+import asyncio
 import logging
+import os
 import time
-from datetime import datetime
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, asynccontextmanager
+from functools import partial
+from contextvars import ContextVar, copy_context
 from threading import Lock
+from typing import Optional, Set, Callable, List, TypeVar
+from weakref import WeakKeyDictionary
 
-import requests
+from bballer.scrapers.cache import DiskCache, CacheEntry, ttl_for, compress, decompress, MemoryCache, \
+    MEMORY_CACHE_BYTES
+from bballer.scrapers.metrics import DownloadEvent
+from bballer.scrapers.mirror import Mirror, MirrorTransport, open_mirror
+from bballer.scrapers.ratelimit import RateLimiter, REQUESTS_PER_SECOND, BURST, MAX_IN_FLIGHT
+from bballer.scrapers.retry import RetryPolicy, RETRY_ERRORS
+from bballer.scrapers.singleflight import SingleFlight, AsyncSingleFlight
+from bballer.scrapers.transport import Transport, SessionTransport, POOL_SIZE, AsyncTransport, \
+    default_async_transport, Response, ThreadedTransport
 
-CACHE_SIZE = 100
-SLEEP_PERIOD_SECS = 0.1
+T = TypeVar("T")
 
 
 class Download:
-    last_download_start_timestamp: float = None
-    # Indicates the time a download was last started.
-    last_set_by: str = None
-    lock = Lock()
-
-    @classmethod
-    @lru_cache(maxsize=CACHE_SIZE)
-    def download(cls, url: str):
-        with cls.lock:
-            # We introduce a small thread-safe delay between the start of each request to give basketball-reference some
-            # breathing room.
-            ts = datetime.now().timestamp()
-            if cls.last_download_start_timestamp:
-                diff = ts - cls.last_download_start_timestamp
-                logging.debug(f"Difference is {diff}s")
-                logging.debug(f"Lock last set by {cls.last_set_by}")
-                if diff < SLEEP_PERIOD_SECS:
-                    sleep = SLEEP_PERIOD_SECS - diff
-                    logging.debug(f"Waiting for {sleep}s")
-                    time.sleep(sleep)
-                else:
-                    logging.debug("Not waiting...")
-        logging.debug(f"Connecting to {url}")
-        cls.last_download_start_timestamp = datetime.now().timestamp()
-        cls.last_set_by = url
-        r = requests.get(url)
-        logging.debug(f"Downloaded in {datetime.now().timestamp() - cls.last_download_start_timestamp}")
+    disk_cache: Optional[DiskCache] = DiskCache(os.environ["BBALLER_CACHE_DIR"]) if os.environ.get(
+        "BBALLER_CACHE_DIR") else None
+    memory_cache: MemoryCache = MemoryCache()
+    transport: Transport = SessionTransport()
+    async_transport: AsyncTransport = default_async_transport()
+    limiter: RateLimiter = RateLimiter()
+    retry_policy: RetryPolicy = RetryPolicy()
+    stale_while_revalidate = False
+    recorder: Optional[Mirror] = None
+    observers: List[Callable[[DownloadEvent], None]] = []
+    _event: ContextVar = ContextVar("download_event", default=None)
+    _in_flight = SingleFlight()
+    _in_flight_async = AsyncSingleFlight()
+    _revalidating: Set[str] = set()
+    _background_tasks: Set[asyncio.Future] = set()
+    _async_users: WeakKeyDictionary = WeakKeyDictionary()
+    # the number of async_session blocks running on each event loop
+    _revalidation_lock = Lock()
+    _recorded: Set[str] = set()
+    _recording_lock = Lock()
+    _revalidation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="revalidate")
+
+    @classmethod
+    def set_transport(cls, transport: Transport):
+        """Fetch pages through {transport} from now on, and close the one used before. This also empties the in-memory
+        cache."""
+        previous, cls.transport = cls.transport, transport
+        if previous is not transport:
+            previous.close()
+        cls.clear_memory_cache()
+
+    @classmethod
+    def set_async_transport(cls, transport: AsyncTransport):
+        """Fetch pages through {transport} in download_async from now on. This also empties the in-memory cache."""
+        cls.async_transport = transport
+        cls.clear_memory_cache()
+
+    @classmethod
+    @asynccontextmanager
+    async def async_session(cls):
+        """
+        Keeps the connections of the async transport open while the block runs, and closes them once the last block
+        running on the event loop is done. The async lookups use one around their downloads, so wrapping several
+        lookups in one makes them share connections, e.g.
+        async with Download.async_session():
+            players = [await player.get_by_id_async(_id) for _id in ids]
+        """
+        loop = asyncio.get_running_loop()
+        cls._async_users[loop] = cls._async_users.get(loop, 0) + 1
+        try:
+            yield
+        finally:
+            cls._async_users[loop] -= 1
+            if not cls._async_users[loop]:
+                del cls._async_users[loop]
+                await cls.async_transport.close()
+
+    @classmethod
+    def use_mirror(cls, path: str):
+        """Serve every page from the snapshot at {path} (a directory or a .tar file) instead of the network. This stops
+        recording, see record_to. The disk cache is neither read nor written while replaying, so a replay doesn't
+        depend on what was downloaded before."""
+        cls.stop_recording()
+        transport = MirrorTransport(open_mirror(path))
+        cls.set_transport(transport)
+        cls.set_async_transport(ThreadedTransport(transport))
+
+    @classmethod
+    def record_to(cls, path: str):
+        """Store every page which is downloaded from now on in the snapshot at {path}, so it can be replayed later
+        with use_mirror. Pages served from the memory or disk cache are stored too. A snapshot which was being
+        recorded before is closed."""
+        cls.stop_recording()
+        with cls._recording_lock:
+            cls._recorded = set()
+            cls.recorder = open_mirror(path)
+
+    @classmethod
+    def stop_recording(cls):
+        """Stop recording pages, and close the snapshot they were stored in."""
+        with cls._recording_lock:
+            recorder, cls.recorder = cls.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    @classmethod
+    def set_pool_size(cls, pool_size: int = POOL_SIZE):
+        """Keep up to {pool_size} connections open, this should match the number of threads downloading pages."""
+        cls.set_transport(SessionTransport(pool_size))
+
+    @classmethod
+    def ensure_pool_size(cls, pool_size: int):
+        """Make sure {pool_size} threads can download pages at the same time without waiting for a connection or the
+        rate limiter's cap on requests in flight. Pipeline and BulkScraper call this with their number of fetchers."""
+        cls.transport.ensure_pool_size(pool_size)
+        cls.limiter.ensure_max_in_flight(pool_size)
+
+    @classmethod
+    def set_rate_limit(cls, rate: float = REQUESTS_PER_SECOND, burst: int = BURST, max_in_flight: int = MAX_IN_FLIGHT):
+        """Allow {rate} requests per second per host with bursts of up to {burst} requests, and at most {max_in_flight}
+        requests at the same time."""
+        cls.limiter = RateLimiter(rate, burst, max_in_flight)
+
+    @classmethod
+    def set_retry_policy(cls, retry_policy: RetryPolicy):
+        """Retry failed requests according to {retry_policy}, use RetryPolicy(max_attempts=1) to never retry."""
+        cls.retry_policy = retry_policy
+
+    @classmethod
+    def use_disk_cache(cls, directory: Optional[str], ttl: Callable[[str], Optional[int]] = ttl_for):
+        """Persist downloaded pages in {directory}, or stop doing so if {directory} is None.
+        {ttl} returns the number of seconds a page may be served from the cache before it has to be revalidated."""
+        cls.disk_cache = DiskCache(directory, ttl) if directory else None
+        cls.clear_memory_cache()
+
+    @classmethod
+    def use_stale_while_revalidate(cls, enabled: bool = True):
+        """Serve expired pages from the disk cache right away, and refresh them in the background."""
+        cls.stale_while_revalidate = enabled
+
+    @classmethod
+    def set_memory_cache(cls, max_bytes: int = MEMORY_CACHE_BYTES, policy: str = "lru", exclude: List[str] = None):
+        """Keep up to {max_bytes} of compressed pages in memory, evicting them according to {policy} ("lru" or "lfu").
+        Pages with a URL matching one of the regular expressions in {exclude} are never kept."""
+        cls.memory_cache = MemoryCache(max_bytes, policy, exclude)
+
+    @classmethod
+    def clear_memory_cache(cls):
+        cls.memory_cache.clear()
+
+    @classmethod
+    def add_observer(cls, observer: Callable[[DownloadEvent], None]):
+        """Calls {observer} with a DownloadEvent after every download, e.g. a MetricsCollector.
+        Observers are called on the downloading thread, so they should be quick."""
+        cls.observers = cls.observers + [observer]
+
+    @classmethod
+    def remove_observer(cls, observer: Callable[[DownloadEvent], None]):
+        cls.observers = [o for o in cls.observers if o != observer]
+
+    @classmethod
+    @contextmanager
+    def _observe(cls, url: str):
+        # the event is available to everything the download calls through _current_event
+        event = DownloadEvent(url=url)
+        token = cls._event.set(event)
+        start = time.monotonic()
+        try:
+            yield event
+        except Exception as e:
+            event.error = repr(e)
+            raise
+        finally:
+            cls._event.reset(token)
+            event.duration = time.monotonic() - start
+            for observer in cls.observers:
+                try:
+                    observer(event)
+                except Exception as e:
+                    logging.warning(f"Download observer {observer} failed: {e}")
+
+    @classmethod
+    def _current_event(cls) -> DownloadEvent:
+        return cls._event.get() or DownloadEvent(url="")
+
+    @classmethod
+    def download(cls, url: str) -> bytes:
+        content = decompress(cls._download_compressed(url))
+        cls._record(url, content)
+        return content
+
+    @classmethod
+    def _record(cls, url: str, content: bytes):
+        # pages are recorded wherever they came from, so a snapshot has every page of the run it was recorded in
+        with cls._recording_lock:
+            recorder = cls.recorder
+            if recorder is None or url in cls._recorded:
+                return
+            cls._recorded.add(url)
+        recorder.put(url, content)
+
+    @classmethod
+    def _download_compressed(cls, url: str) -> bytes:
+        # pages are only decompressed when they're about to be parsed
+        with cls._observe(url) as event:
+            body = cls.memory_cache.get(url, cls._ttl(url))
+            if body is not None:
+                event.source = "memory"
+                return body
+            # threads which ask for a page that is already being downloaded wait for that download instead
+            body = cls._in_flight.do(url, cls._load, url)
+            event.source = event.source or "shared"
+            return body
+
+    @classmethod
+    def _load(cls, url: str) -> bytes:
+        entry = cls._lookup(url) if cls.transport.cached else None
+        if entry and entry.is_fresh(cls.disk_cache.ttl(url)):
+            logging.debug(f"Found {url} in disk cache")
+            cls._current_event().source = "disk"
+            cls.memory_cache.set(url, entry.body, entry.fetched_at)
+            return entry.body
+        if entry and cls.stale_while_revalidate:
+            cls._current_event().source = "stale"
+            # before the refresh starts, which replaces it
+            cls.memory_cache.set(url, entry.body, entry.fetched_at)
+            if cls._start_revalidating(url):
+                cls._revalidation_executor.submit(cls._revalidate_in_background, url, entry)
+            return entry.body
+        return cls._refresh(url, entry)
+
+    @classmethod
+    async def download_async(cls, url: str) -> bytes:
+        """Like download, but waits for the network without blocking the event loop. Call it in an async_session, so the
+        connections it opens are closed on the same loop."""
+        content = await cls._off_loop(decompress, await cls._download_compressed_async(url))
+        if cls.recorder is not None:
+            await cls._off_loop(cls._record, url, content)
+        return content
+
+    @classmethod
+    async def _download_compressed_async(cls, url: str) -> bytes:
+        with cls._observe(url) as event:
+            body = cls.memory_cache.get(url, cls._ttl(url))
+            if body is not None:
+                event.source = "memory"
+                return body
+            body = await cls._in_flight_async.do(url, cls._load_async, url)
+            event.source = event.source or "shared"
+            return body
+
+    @classmethod
+    async def _load_async(cls, url: str) -> bytes:
+        entry = await cls._off_loop(cls._lookup, url) if cls.async_transport.cached else None
+        if entry and entry.is_fresh(cls.disk_cache.ttl(url)):
+            logging.debug(f"Found {url} in disk cache")
+            cls._current_event().source = "disk"
+            cls.memory_cache.set(url, entry.body, entry.fetched_at)
+            return entry.body
+        if entry and cls.stale_while_revalidate:
+            cls._current_event().source = "stale"
+            cls.memory_cache.set(url, entry.body, entry.fetched_at)
+            if cls._start_revalidating(url):
+                task = asyncio.ensure_future(cls._revalidate_in_background_async(url, entry))
+                # the event loop only keeps a weak reference to its tasks
+                cls._background_tasks.add(task)
+                task.add_done_callback(cls._background_tasks.discard)
+            return entry.body
+        r = await cls._fetch_async(url, entry)
+        return await cls._off_loop(cls._store, url, entry, r, cls.async_transport.cached)
+
+    @classmethod
+    def _ttl(cls, url: str) -> Optional[int]:
+        # pages kept in memory expire like the ones on disk, so a long running process sees in-season pages change
+        return cls.disk_cache.ttl(url) if cls.disk_cache else ttl_for(url)
+
+    @classmethod
+    async def _off_loop(cls, fn: Callable[..., T], *args) -> T:
+        # reading the disk cache and (de)compressing a page would stall the event loop, so they run in its default
+        # executor, in a copy of the current context so they still see the DownloadEvent of the download
+        context = copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, partial(context.run, fn, *args))
+
+    @classmethod
+    def _lookup(cls, url: str) -> Optional[CacheEntry]:
+        return cls.disk_cache.load(url) if cls.disk_cache else None
+
+    @classmethod
+    def _refresh(cls, url: str, entry: CacheEntry = None) -> bytes:
+        return cls._store(url, entry, cls._fetch(url, entry), cls.transport.cached)
+
+    @classmethod
+    def _store(cls, url: str, entry: Optional[CacheEntry], r: Response, cached: bool = True) -> bytes:
+        """
+        Stores the page in the memory cache, and in the disk cache if the transport which fetched it is {cached}, and
+        returns it compressed. The loaders store pages before their flight ends, so that a caller arriving in between
+        finds the page rather than downloading it again.
+        """
+        disk_cache = cls.disk_cache if cached else None
+        event = cls._current_event()
+        if r.status_code == 304 and entry:
+            event.source = "revalidated"
+            logging.debug(f"{url} has not changed")
+            if disk_cache:
+                disk_cache.touch(url)
+            cls.memory_cache.set(url, entry.body)
+            return entry.body
+        event.source = "network"
         r.raise_for_status()
-        return r.content
+        body = compress(r.content)
+        if disk_cache:
+            disk_cache.set_compressed(url, body, etag=r.headers.get("ETag"),
+                                      last_modified=r.headers.get("Last-Modified"))
+        cls.memory_cache.set(url, body)
+        return body
+
+    @classmethod
+    def _start_revalidating(cls, url: str) -> bool:
+        # only one refresh per page at a time
+        with cls._revalidation_lock:
+            if url in cls._revalidating:
+                return False
+            cls._revalidating.add(url)
+            return True
+
+    @classmethod
+    def _revalidate_in_background(cls, url: str, entry: CacheEntry):
+        try:
+            with cls._observe(url):
+                cls._refresh(url, entry)
+        except Exception as e:
+            logging.warning(f"Could not refresh {url}: {e}")
+        finally:
+            with cls._revalidation_lock:
+                cls._revalidating.discard(url)
+
+    @classmethod
+    async def _revalidate_in_background_async(cls, url: str, entry: CacheEntry):
+        try:
+            with cls._observe(url):
+                r = await cls._fetch_async(url, entry)
+                await cls._off_loop(cls._store, url, entry, r, cls.async_transport.cached)
+        except Exception as e:
+            logging.warning(f"Could not refresh {url}: {e}")
+        finally:
+            with cls._revalidation_lock:
+                cls._revalidating.discard(url)
+
+    @classmethod
+    def _fetch(cls, url: str, entry: CacheEntry = None) -> Response:
+        attempt = 0
+        while True:
+            try:
+                r = cls._fetch_once(url, entry)
+                delay = cls.retry_policy.next_delay(attempt, response=r)
+            except RETRY_ERRORS as e:
+                delay = cls.retry_policy.next_delay(attempt, error=e)
+                if delay is None:
+                    raise
+                r = None
+            if delay is None:
+                return r
+            attempt += 1
+            cls._current_event().retries = attempt
+            if cls._back_off(url, r, delay, attempt):
+                time.sleep(delay)
+
+    @classmethod
+    def _fetch_once(cls, url: str, entry: CacheEntry = None) -> Response:
+        headers = entry.validators() if entry else None
+        if not cls.transport.throttled:
+            return cls._timed(cls.transport.get, url, headers)
+        # Requests are spaced out to give basketball-reference some breathing room.
+        with cls.limiter.limit(url) as waited:
+            if waited:
+                logging.debug(f"Waited {waited}s before downloading {url}")
+            cls._current_event().throttle_wait += waited
+            logging.debug(f"Connecting to {url}")
+            return cls._timed(cls.transport.get, url, headers)
+
+    @classmethod
+    def _timed(cls, get, url: str, headers) -> Response:
+        event = cls._current_event()
+        start = time.monotonic()
+        try:
+            r = get(url, headers)
+        finally:
+            event.latency += time.monotonic() - start
+        logging.debug(f"Downloaded in {time.monotonic() - start}")
+        event.status_code = r.status_code
+        event.bytes += len(r.content)
+        return r
+
+    @classmethod
+    async def _timed_async(cls, get, url: str, headers) -> Response:
+        event = cls._current_event()
+        start = time.monotonic()
+        try:
+            r = await get(url, headers)
+        finally:
+            event.latency += time.monotonic() - start
+        logging.debug(f"Downloaded in {time.monotonic() - start}")
+        event.status_code = r.status_code
+        event.bytes += len(r.content)
+        return r
+
+    @classmethod
+    def _back_off(cls, url: str, r: Optional[Response], delay: float, attempt: int) -> bool:
+        """Returns whether the caller itself has to wait {delay} seconds before trying again."""
+        reason = r.status_code if r is not None else "connection error"
+        logging.warning(f"Retrying {url} in {delay:.1f}s after {reason} (attempt {attempt + 1})")
+        if r is not None and r.status_code == 429:
+            # we're going too fast, so every thread has to wait
+            cls.limiter.pause(delay)
+            return False
+        return True
+
+    @classmethod
+    async def _fetch_async(cls, url: str, entry: CacheEntry = None) -> Response:
+        attempt = 0
+        while True:
+            try:
+                r = await cls._fetch_once_async(url, entry)
+                delay = cls.retry_policy.next_delay(attempt, response=r)
+            except RETRY_ERRORS as e:
+                delay = cls.retry_policy.next_delay(attempt, error=e)
+                if delay is None:
+                    raise
+                r = None
+            if delay is None:
+                return r
+            attempt += 1
+            cls._current_event().retries = attempt
+            if cls._back_off(url, r, delay, attempt):
+                await asyncio.sleep(delay)
+
+    @classmethod
+    async def _fetch_once_async(cls, url: str, entry: CacheEntry = None) -> Response:
+        headers = entry.validators() if entry else None
+        if not cls.async_transport.throttled:
+            return await cls._timed_async(cls.async_transport.get, url, headers)
+        async with cls.limiter.limit_async(url) as waited:
+            if waited:
+                logging.debug(f"Waited {waited}s before downloading {url}")
+            cls._current_event().throttle_wait += waited
+            logging.debug(f"Connecting to {url}")
+            return await cls._timed_async(cls.async_transport.get, url, headers)
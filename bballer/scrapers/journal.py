@@ -0,0 +1,86 @@
+import pickle
+import sqlite3
+import time
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+class Journal:
+    """
+    Records the result of every page a bulk job has scraped in an SQLite database, so that when the job is run again,
+    e.g. after a crash, the pages which were done are skipped and only the remaining ones are scraped. Results are
+    stored pickled, and committed as soon as they are recorded. Pages which could not be scraped are recorded too,
+    with their error, until they are scraped after all.
+    """
+
+    def __init__(self, path: str):
+        """
+        @param path: the database file, which is created if it doesn't exist yet.
+        """
+        self.path = path
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results "
+                                 "(url TEXT PRIMARY KEY, result BLOB NOT NULL, recorded_at REAL NOT NULL)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS failures "
+                                 "(url TEXT PRIMARY KEY, error TEXT NOT NULL, failed_at REAL NOT NULL)")
+        self._connection.commit()
+        self._done = {url for url, in self._connection.execute("SELECT url FROM results")}
+        self._failed = {url for url, in self._connection.execute("SELECT url FROM failures")}
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, url: str) -> Optional[Any]:
+        """Returns the recorded result for {url}, or None if it isn't done."""
+        with self._lock:
+            row = self._connection.execute("SELECT result FROM results WHERE url = ?", (url,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def record(self, url: str, result: Any):
+        """Records {result} as the result for {url}, replacing an earlier one."""
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (url, data, time.time()))
+            self._connection.execute("DELETE FROM failures WHERE url = ?", (url,))
+            self._connection.commit()
+            self._done.add(url)
+            self._failed.discard(url)
+
+    def record_failure(self, url: str, error: str):
+        """Records that {url} could not be scraped because of {error}, unless it has a result."""
+        with self._lock:
+            if url in self._done:
+                return
+            self._connection.execute("INSERT OR REPLACE INTO failures VALUES (?, ?, ?)", (url, error, time.time()))
+            self._connection.commit()
+            self._failed.add(url)
+
+    def failed(self, url: str) -> bool:
+        """Returns whether {url} could not be scraped the last time it was tried."""
+        return url in self._failed
+
+    def failures(self) -> Dict[str, str]:
+        """Returns the error of every page which could not be scraped, by URL."""
+        with self._lock:
+            return dict(self._connection.execute("SELECT url, error FROM failures ORDER BY url"))
+
+    def results(self, urls: Iterable[str] = None) -> Iterator[Tuple[str, Any]]:
+        """Yields (url, result) for each of {urls} which is done, or for every recorded page if {urls} is None."""
+        for url in (sorted(self._done) if urls is None else urls):
+            if url in self._done:
+                yield url, self.get(url)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,114 @@
+import json
+from collections import Counter
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+SOURCES = ("memory", "shared", "disk", "stale", "revalidated", "network")
+# Where a page came from: the memory cache, a download another thread was already doing, the disk cache (fresh or
+# expired), the disk cache after the server said it hadn't changed, or the network.
+
+
+@dataclass
+class DownloadEvent:
+    """
+    Describes a single call to Download.download, passed to every observer once the call is done.
+    """
+    url: str
+    source: Optional[str] = None
+    status_code: Optional[int] = None
+    bytes: int = 0
+    # size of the downloaded content, 0 if it didn't come from the network
+    latency: float = 0.0
+    # seconds spent waiting for the server, summed over all attempts
+    throttle_wait: float = 0.0
+    # seconds spent waiting for the rate limiter
+    retries: int = 0
+    duration: float = 0.0
+    # seconds the whole call took
+    error: Optional[str] = None
+
+
+class MetricsCollector:
+    """
+    Observer which aggregates download events, add it with Download.add_observer.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.downloads = 0
+            self.sources = Counter()
+            self.status_codes = Counter()
+            self.bytes = 0
+            self.latency = 0.0
+            self.max_latency = 0.0
+            self.throttle_wait = 0.0
+            self.retries = 0
+            self.duration = 0.0
+            self.errors = 0
+
+    def __call__(self, event: DownloadEvent):
+        with self._lock:
+            self.downloads += 1
+            self.sources[event.source] += 1
+            if event.status_code is not None:
+                self.status_codes[event.status_code] += 1
+            self.bytes += event.bytes
+            self.latency += event.latency
+            self.max_latency = max(self.max_latency, event.latency)
+            self.throttle_wait += event.throttle_wait
+            self.retries += event.retries
+            self.duration += event.duration
+            self.errors += 1 if event.error else 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            memory_hits = self.sources["memory"] + self.sources["shared"]
+            disk_hits = self.sources["disk"] + self.sources["stale"]
+            return {
+                "downloads": self.downloads,
+                "sources": {source: self.sources[source] for source in SOURCES},
+                "cache": {
+                    "memory": {"hits": memory_hits, "misses": self.downloads - memory_hits},
+                    "disk": {"hits": disk_hits, "misses": self.downloads - memory_hits - disk_hits},
+                },
+                "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+                "bytes": self.bytes,
+                "latency_seconds": {"sum": self.latency, "max": self.max_latency},
+                "throttle_wait_seconds": self.throttle_wait,
+                "retries": self.retries,
+                "duration_seconds": self.duration,
+                "errors": self.errors,
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, prefix: str = "bballer") -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, samples):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join([f'{key}="{val}"' for key, val in labels.items()])
+                lines.append(f"{prefix}_{name}{{{label_str}}} {value}" if label_str else f"{prefix}_{name} {value}")
+
+        metric("downloads_total", "counter", [({"source": s}, n) for s, n in snapshot["sources"].items()])
+        metric("cache_requests_total", "counter",
+               [({"layer": layer, "result": result}, n) for layer, results in snapshot["cache"].items()
+                for result, n in results.items()])
+        metric("responses_total", "counter", [({"status": s}, n) for s, n in snapshot["status_codes"].items()])
+        metric("downloaded_bytes_total", "counter", [({}, snapshot["bytes"])])
+        metric("network_latency_seconds_total", "counter", [({}, snapshot["latency_seconds"]["sum"])])
+        metric("network_latency_seconds_max", "gauge", [({}, snapshot["latency_seconds"]["max"])])
+        metric("throttle_wait_seconds_total", "counter", [({}, snapshot["throttle_wait_seconds"])])
+        metric("retries_total", "counter", [({}, snapshot["retries"])])
+        metric("download_duration_seconds_total", "counter", [({}, snapshot["duration_seconds"])])
+        metric("errors_total", "counter", [({}, snapshot["errors"])])
+        return "\n".join(lines) + "\n"
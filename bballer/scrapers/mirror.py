@@ -0,0 +1,156 @@
+import io
+import mmap
+import os
+import tarfile
+import time
+from threading import Lock, get_ident
+from typing import Optional, Dict, Tuple, Mapping
+from urllib.parse import urlsplit, quote
+
+from bballer.scrapers.cache import normalize_url
+from bballer.scrapers.transport import Transport, Response
+
+
+def url_to_path(url: str) -> str:
+    """
+    Returns the relative path under which the page at {url} is stored in a mirror, e.g.
+    "https://www.basketball-reference.com/teams/CLE/" -> "www.basketball-reference.com/teams/CLE/index.html"
+    """
+    parts = urlsplit(normalize_url(url))
+    segments = [s for s in parts.path.split("/") if s and s not in (".", "..")]
+    if not segments or "." not in segments[-1]:
+        # "/players/m/mbengdj01/gamelog/2008" and ".../2008/" are the same page
+        segments.append("index.html")
+    if parts.query:
+        segments[-1] += "@" + quote(parts.query, safe="=&")
+    return "/".join([parts.netloc] + segments)
+
+
+class Mirror:
+    """
+    A local snapshot of basketball-reference, recorded during a live run.
+    """
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Returns the stored page for {url}, or None if it is not part of the snapshot."""
+        raise NotImplementedError
+
+    def put(self, url: str, content: bytes):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class DirectoryMirror(Mirror):
+    """
+    Snapshot stored as one file per page, laid out like the site itself.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, *url_to_path(url).split("/"))
+
+    def get(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url: str, content: bytes):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+
+class ArchiveMirror(Mirror):
+    """
+    Snapshot stored in a single uncompressed tar file. The archive is indexed once when it is opened and then memory
+    mapped, so a page is read by slicing it out of the mapping. Pages which are recorded again replace the earlier copy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._mapped: Optional[mmap.mmap] = None
+        self._writer: Optional[tarfile.TarFile] = None
+        if os.path.isfile(path):
+            with tarfile.open(path, "r:") as archive:
+                for member in archive:
+                    self._index[member.name] = (member.offset_data, member.size)
+
+    def _map(self) -> Optional[mmap.mmap]:
+        if self._mapped is None and os.path.isfile(self.path) and os.path.getsize(self.path):
+            with open(self.path, "rb") as f:
+                self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapped
+
+    def get(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            location = self._index.get(url_to_path(url))
+            if location is None:
+                return None
+            offset, size = location
+            return self._map()[offset:offset + size]
+
+    def put(self, url: str, content: bytes):
+        info = tarfile.TarInfo(url_to_path(url))
+        info.size = len(content)
+        info.mtime = int(time.time())
+        with self._lock:
+            if self._writer is None:
+                self._writer = tarfile.open(self.path, "a:")
+            writer = self._writer
+            # long names take extra header blocks, so the data starts after however long the header turns out to be
+            offset_data = writer.offset + len(info.tobuf(writer.format, writer.encoding, writer.errors))
+            writer.addfile(info, io.BytesIO(content))
+            # so the page can be read back, also by another process, before the archive is closed
+            writer.fileobj.flush()
+            self._index[info.name] = (offset_data, info.size)
+            self._unmap()  # the archive has grown
+
+    def _unmap(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+            if self._writer:
+                self._writer.close()
+                self._writer = None
+
+
+def open_mirror(path: str) -> Mirror:
+    """Opens the snapshot at {path}, which is either a directory or a tar file."""
+    if path.endswith(".tar"):
+        return ArchiveMirror(path)
+    return DirectoryMirror(path)
+
+
+class MirrorTransport(Transport):
+    """
+    Serves pages from a Mirror without touching the network. Pages which are not in the snapshot result in a 404.
+    """
+    throttled = False
+    cached = False
+
+    def __init__(self, mirror: Mirror):
+        self.mirror = mirror
+
+    def get(self, url: str, headers: Mapping[str, str] = None) -> Response:
+        content = self.mirror.get(url)
+        if content is None:
+            return Response(url=url, status_code=404, content=b"")
+        return Response(url=url, status_code=200, content=content)
+
+    def close(self):
+        self.mirror.close()
@@ -1,30 +1,169 @@
-import concurrent.futures
-from typing import Iterator
+import asyncio
+import logging
+from itertools import islice
+from typing import Iterator, AsyncIterator, Tuple
+
+from bs4 import SoupStrainer
 
 from bballer.models.player import Player
 from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
-from bballer.scrapers.base import Scraper
+from bballer.scrapers.base import Scraper, scrape_async
+from bballer.scrapers.download import Download
+from bballer.scrapers.journal import Journal
+from bballer.scrapers.pipeline import Pipeline, fetch_async, parse, process_pool
+from bballer.scrapers.transport import POOL_SIZE
 
 
 class TotalMinutesScraper(Scraper):
+    regions = (SoupStrainer("table", id="totals_stats"),)
+
     def get_content(self):
         return self.get_player_urls()
 
-    def __init__(self, year: int):
-        url = f"https://www.basketball-reference.com/leagues/NBA_{year}_totals.html"
-        super().__init__(url)
+    def __init__(self, year: int, content: bytes = None):
+        super().__init__(self.get_url(year), content)
+
+    @staticmethod
+    def get_url(year: int) -> str:
+        return f"https://www.basketball-reference.com/leagues/NBA_{year}_totals.html"
 
     def get_player_urls(self):
-        cells = self._parsed.find_all("td", {"data-stat": "player"})
-        return ["https://www.basketball-reference.com" + cell.find_next("a").attrs["href"] for cell in cells]
+        cells = self.get_table_with_id("totals_stats").find_all("td", {"data-stat": "player"})
+        return ["https://www.basketball-reference.com" + cell.find("a").attrs["href"] for cell in cells]
 
 
 class BulkScraper:
-    def __init__(self, urls):
+    def __init__(self, urls, workers: int = POOL_SIZE, processes: int = None, window: int = None,
+                 journal: Journal = None, skip_errors: bool = False, retry_failed: bool = True):
+        """
+        @param urls: the URLs or paths of the player pages.
+        @param workers: the number of pages fetched at once.
+        @param processes: if specified, the pages are parsed in this many processes rather than on {workers} threads,
+        so that parsing isn't limited to a single core.
+        @param window: the most pages stream, scrape_all and scrape_all_async have in flight (being fetched, parsed or
+        waiting for either) at once, twice the number of workers by default.
+        @param journal: if specified, every player is recorded in it, and the players it already has are taken from it
+        instead of being scraped again, so a job which was interrupted can be resumed.
+        @param skip_errors: if True, the pages which can't be scraped are logged and skipped instead of raising the
+        error.
+        @param retry_failed: if False, the pages the journal has as failed are skipped.
+        """
         self._urls = urls
+        self.workers = workers
+        self.processes = processes
+        self.window = window or 2 * workers
+        self.journal = journal
+        self.skip_errors = skip_errors
+        self.retry_failed = retry_failed
+
+    def _unique_urls(self, _max: int = None) -> Iterator[str]:
+        """Iterates the first {_max} URLs lazily, skipping the ones which were seen before."""
+        seen = set()
+        for url in iter(self._urls) if _max is None else islice(self._urls, _max):
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+    def _record(self, url: str, player: Player):
+        if self.journal is not None and url not in self.journal:
+            self.journal.record(url, player)
 
     def scrape_all(self, _max: int = None) -> Iterator[Player]:
-        urls = list(set(self._urls[0:_max] if _max else self._urls))
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            for player in executor.map(lambda u: PlayerPageScraper(u).get_content(), urls):
-                yield player
+        """Scrapes the pages, and yields the players in the order in which they are done, see stream."""
+        for _, player in self.stream(_max):
+            yield player
+
+    def stream(self, _max: int = None) -> Iterator[Tuple[str, Player]]:
+        """
+        Scrapes the pages while the URLs are iterated, and yields (url, player) as soon as each page is done, in the
+        order in which they are done. At most {window} pages are in flight at once, so memory use doesn't depend on the
+        number of URLs, and a slow page doesn't hold up the others. URLs which were seen before are skipped, and the
+        players the journal already has are yielded without scraping them again. The players are fully built, see
+        Player.materialize.
+        """
+        pipeline = Pipeline(PlayerPageScraper, fetchers=self.workers, parsers=self.processes or self.workers,
+                            processes=bool(self.processes), window=self.window)
+        return pipeline.run(self._unique_urls(_max), self.journal, self.skip_errors, self.retry_failed)
+
+    async def scrape_all_async(self, _max: int = None) -> AsyncIterator[Player]:
+        """
+        Like scrape_all, but without blocking the event loop. At most {workers} pages are fetched or parsed at once,
+        and at most {window} pages are in flight, from when their URL is taken until their player is consumed.
+        """
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.workers)
+        # for when the pages are downloaded on threads, see ThreadedTransport
+        Download.ensure_pool_size(self.workers)
+        parsers = process_pool(PlayerPageScraper, self.processes) if self.processes else None
+        parsing = set()
+        # the futures of the pages being parsed in {parsers}, which are cancelled if the caller stops early
+        skipped = object()
+
+        async def scrape(url):
+            journal = self.journal
+            if journal is not None:
+                # the journal is read and written in the loop's default executor, like the pages are parsed
+                if await loop.run_in_executor(None, journal.__contains__, url):
+                    return await loop.run_in_executor(None, journal.get, url)
+                if not self.retry_failed and await loop.run_in_executor(None, journal.failed, url):
+                    return skipped
+            try:
+                async with in_flight:
+                    if parsers:
+                        future = parsers.submit(parse, PlayerPageScraper, url, await fetch_async(url))
+                        parsing.add(future)
+                        player = await asyncio.wrap_future(future)
+                        parsing.discard(future)
+                    else:
+                        player = await scrape_async(url, lambda content: PlayerPageScraper(url, content).get_content())
+                if journal is not None:
+                    await loop.run_in_executor(None, self._record, url, player)
+            except Exception as e:
+                if journal is not None:
+                    await loop.run_in_executor(None, self._record_failure, url, e)
+                raise
+            return player
+
+        urls = self._unique_urls(_max)
+        pending = {}
+
+        def submit_more():
+            while len(pending) < self.window:
+                url = next(urls, None)
+                if url is None:
+                    return
+                pending[asyncio.ensure_future(scrape(url))] = url
+
+        async with Download.async_session():
+            try:
+                submit_more()
+                while pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        url = pending.pop(task)
+                        try:
+                            player = task.result()
+                        except Exception as e:
+                            if not self.skip_errors:
+                                raise
+                            logging.warning(f"Skipping {url}: {e!r}")
+                            continue
+                        if player is not skipped:
+                            yield player
+                    # only once the consumer is done with the players
+                    submit_more()
+            finally:
+                for task in pending:
+                    task.cancel()
+                # so none of them is still downloading when the session is closed
+                await asyncio.gather(*pending, return_exceptions=True)
+                if parsers:
+                    for future in parsing:
+                        future.cancel()
+                    parsers.shutdown(wait=False)
+
+    def _record_failure(self, url: str, error: Exception):
+        try:
+            self.journal.record_failure(url, repr(error))
+        except Exception as e:
+            logging.warning(f"Could not record the failure of {url}: {e}")
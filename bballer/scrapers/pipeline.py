@@ -0,0 +1,284 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import time
+from queue import Queue, Full, Empty
+from threading import Lock, Event, Semaphore, Thread
+from typing import Callable, Iterable, Iterator, Tuple, Dict, Any, Optional, TypeVar
+
+from bballer.scrapers.base import Scraper, materialize
+from bballer.scrapers.download import Download
+from bballer.scrapers.journal import Journal
+from bballer.scrapers.transport import POOL_SIZE
+
+T = TypeVar("T")
+
+POLL_INTERVAL = 0.1
+# seconds a worker waits on a queue before checking whether the pipeline was stopped
+
+
+def fetch(url: str):
+    """Downloads {url}. Returns None for paths, which are read by the scraper parsing them."""
+    return Download.download(url) if url.startswith("http") else None
+
+
+async def fetch_async(url: str):
+    """Downloads {url} without blocking the event loop, see fetch."""
+    return await Download.download_async(url) if url.startswith("http") else None
+
+
+def configure(scraper, parser: Optional[str], fast_tables: bool):
+    """Applies the parser settings of the parent process in a parsing process, which might not have inherited them."""
+    if isinstance(scraper, type) and issubclass(scraper, Scraper):
+        scraper.set_parser(parser)
+        scraper.use_fast_tables(fast_tables)
+
+
+def process_pool(scraper, processes: int) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Returns a pool of {processes} processes to parse pages with {scraper} in.
+
+    The processes are spawned rather than forked: they are started once the fetch threads are running, and a fork
+    would copy whichever locks those threads hold into the children.
+    """
+    settings = (scraper, getattr(scraper, "parser", None), getattr(scraper, "fast_tables", False))
+    return concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=configure, initargs=settings,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+
+
+def parse(scraper: Callable[[str, Any], Scraper], url: str, content):
+    """Scrapes {content} with a new scraper, and returns its content fully built, see materialize."""
+    return materialize(scraper(url, content).get_content())
+
+
+class Stage:
+    """
+    A pool of workers of a Pipeline, which keeps track of how long its workers are busy.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._lock = Lock()
+        self.items = 0
+        self.busy = 0.0
+        # seconds the workers spent working on items, summed over the workers
+        self.elapsed = 0.0
+        # seconds the stage has been running
+        self._started: Optional[float] = None
+
+    def start(self):
+        with self._lock:
+            self._started = time.perf_counter()
+
+    def stop(self):
+        with self._lock:
+            if self._started is not None:
+                self.elapsed += time.perf_counter() - self._started
+                self._started = None
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.items += 1
+            self.busy += seconds
+
+    def utilization(self) -> float:
+        """Returns the share of the time the workers were busy, between 0 and 1."""
+        with self._lock:
+            elapsed = self.elapsed + (time.perf_counter() - self._started if self._started is not None else 0.0)
+            return min(1.0, self.busy / (elapsed * self.workers)) if elapsed else 0.0
+
+    def snapshot(self) -> dict:
+        return {"workers": self.workers, "items": self.items, "busy_seconds": self.busy,
+                "utilization": self.utilization()}
+
+
+class Pipeline:
+    """
+    Scrapes pages in two stages: a pool of fetchers downloads the pages, and a pool of parsers turns them into models.
+    The stages are connected by bounded queues, so fetchers wait when the parsers fall behind rather than piling up
+    pages in memory, and the number of each can be sized for the network and the CPU separately, e.g.
+    Pipeline(GameLogScraper, fetchers=16, parsers=4, processes=True).run(urls)
+    """
+
+    def __init__(self, scraper: Callable[[str, Any], Scraper], fetchers: int = POOL_SIZE, parsers: int = 1,
+                 queue_size: int = None, processes: bool = False, window: int = None):
+        """
+        @param scraper: a Scraper subclass, or any function which takes a URL and the downloaded page and returns a
+        scraper for it, e.g. lambda url, content: TeamPageScraper(url, content).
+        @param fetchers: the number of pages downloaded at once.
+        @param parsers: the number of pages parsed at once.
+        @param queue_size: the most pages waiting to be parsed, and the most results waiting to be consumed. Twice the
+        number of parsers by default.
+        @param processes: whether the pages are parsed in a pool of {parsers} processes, which uses several cores.
+        {scraper} and the models it returns have to be picklable then, so it can't be a lambda.
+        @param window: if specified, the most pages in flight at once, from when their URL is taken until their result
+        is consumed, whether they are being fetched, parsed or waiting in a queue.
+        """
+        self.scraper = scraper
+        self.fetch_stage = Stage("fetch", fetchers)
+        self.parse_stage = Stage("parse", parsers)
+        self.queue_size = queue_size or 2 * parsers
+        self.processes = processes
+        self.window = window
+
+    def stats(self) -> Dict[str, dict]:
+        return {stage.name: stage.snapshot() for stage in (self.fetch_stage, self.parse_stage)}
+
+    def utilization(self) -> Dict[str, float]:
+        return {stage.name: stage.utilization() for stage in (self.fetch_stage, self.parse_stage)}
+
+    def run(self, urls: Iterable[str], journal: Journal = None, skip_errors: bool = False,
+            retry_failed: bool = True) -> Iterator[Tuple[str, T]]:
+        """
+        Scrapes the pages while {urls} is iterated, and yields (url, result) in the order in which they are done.
+        An exception raised while fetching or parsing a page stops the pipeline and is raised here.
+        @param journal: if specified, every result is recorded in it before it is yielded, and the results it already
+        has are yielded without scraping their pages again, so a run which was interrupted can be resumed. Pages which
+        can't be scraped are recorded in it as failed.
+        @param skip_errors: if True, a page which can't be scraped is logged and skipped instead of stopping the
+        pipeline, so a page which always fails doesn't keep a job from getting past it.
+        @param retry_failed: if False, the pages the journal has as failed are skipped rather than tried again.
+        """
+        urls = iter(urls)
+        urls_lock = Lock()
+        fetched = Queue(self.queue_size)
+        results = Queue(self.queue_size)
+        stopped = Event()
+        done = object()
+        # put on a queue once the stage feeding it is done, once for each worker reading from it
+        remaining_fetchers = self.fetch_stage.workers
+        in_flight = Semaphore(self.window) if self.window else None
+        pool = process_pool(self.scraper, self.parse_stage.workers) if self.processes else None
+        Download.ensure_pool_size(self.fetch_stage.workers)
+
+        def put(queue: Queue, item) -> bool:
+            while not stopped.is_set():
+                try:
+                    queue.put(item, timeout=POLL_INTERVAL)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def get(queue: Queue):
+            while not stopped.is_set():
+                try:
+                    return queue.get(timeout=POLL_INTERVAL)
+                except Empty:
+                    continue
+            return done
+
+        def take_slot() -> bool:
+            while not stopped.is_set():
+                if in_flight.acquire(timeout=POLL_INTERVAL):
+                    return True
+            return False
+
+        def fetch_worker():
+            nonlocal remaining_fetchers
+            try:
+                while not stopped.is_set():
+                    if in_flight and not take_slot():
+                        return
+                    try:
+                        with urls_lock:
+                            url = next(urls, None)
+                    except Exception as e:
+                        # {urls} itself failed, which stops the pipeline like any other error
+                        put(fetched, (None, None, e, False))
+                        return
+                    if url is None:
+                        if in_flight:
+                            in_flight.release()
+                        return
+                    if journal is not None and url in journal:
+                        item = (url, None, None, True)
+                    elif journal is not None and not retry_failed and journal.failed(url):
+                        if in_flight:
+                            in_flight.release()
+                        continue
+                    else:
+                        start = time.perf_counter()
+                        try:
+                            item = (url, fetch(url), None, False)
+                        except Exception as e:
+                            item = (url, None, e, False)
+                        self.fetch_stage.record(time.perf_counter() - start)
+                    if not put(fetched, item):
+                        return
+            finally:
+                with urls_lock:
+                    remaining_fetchers -= 1
+                    last = remaining_fetchers == 0
+                if last:
+                    for _ in range(self.parse_stage.workers):
+                        put(fetched, done)
+
+        def parse_worker():
+            try:
+                while True:
+                    item = get(fetched)
+                    if item is done:
+                        return
+                    url, content, error, recorded = item
+                    result = None
+                    if recorded:
+                        try:
+                            result = journal.get(url)
+                        except Exception as e:
+                            error = e
+                    elif error is None:
+                        start = time.perf_counter()
+                        try:
+                            if pool:
+                                result = pool.submit(parse, self.scraper, url, content).result()
+                            else:
+                                result = parse(self.scraper, url, content)
+                            if journal is not None:
+                                journal.record(url, result)
+                        except Exception as e:
+                            error = e
+                        self.parse_stage.record(time.perf_counter() - start)
+                    if error is not None and url is not None and journal is not None:
+                        try:
+                            journal.record_failure(url, repr(error))
+                        except Exception as e:
+                            logging.warning(f"Could not record the failure of {url}: {e}")
+                    if not put(results, (url, result, error)):
+                        return
+            finally:
+                put(results, done)
+
+        threads = [Thread(target=fetch_worker, daemon=True) for _ in range(self.fetch_stage.workers)] + \
+                  [Thread(target=parse_worker, daemon=True) for _ in range(self.parse_stage.workers)]
+        self.fetch_stage.start()
+        self.parse_stage.start()
+        for thread in threads:
+            thread.start()
+        try:
+            finished = 0
+            while finished < self.parse_stage.workers:
+                item = results.get()
+                if item is done:
+                    finished += 1
+                    continue
+                url, result, error = item
+                if error is not None and skip_errors and url is not None:
+                    logging.warning(f"Skipping {url}: {error!r}")
+                elif error is not None:
+                    raise error
+                else:
+                    yield url, result
+                if in_flight:
+                    # only once the consumer is done with the result
+                    in_flight.release()
+        finally:
+            stopped.set()
+            for thread in threads:
+                thread.join()
+            if pool:
+                # the parse workers wait for what they submit, so nothing is left to cancel once they are joined
+                pool.shutdown()
+            self.fetch_stage.stop()
+            self.parse_stage.stop()
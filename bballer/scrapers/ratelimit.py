@@ -0,0 +1,122 @@
+import asyncio
+import time
+from contextlib import contextmanager, asynccontextmanager
+from threading import Lock, Semaphore
+from typing import Dict
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+from bballer.scrapers.transport import POOL_SIZE
+
+REQUESTS_PER_SECOND = 10.0
+BURST = 1
+MAX_IN_FLIGHT = POOL_SIZE
+
+
+class TokenBucket:
+    """
+    Allows {rate} requests per second on average, and up to {burst} requests at once.
+    Threads only hold the lock to do the bookkeeping, the actual waiting happens outside of it.
+    """
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, burst: int = BURST):
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst must be at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns the number of seconds the caller has to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # the token count goes negative when callers are queued up, each of them waits for its own turn
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Spaces out requests with a token bucket per host, and caps the number of requests in flight.
+    """
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, burst: int = BURST, max_in_flight: int = MAX_IN_FLIGHT):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = Lock()
+        self._in_flight = Semaphore(max_in_flight)
+        self._async_in_flight = WeakKeyDictionary()
+        self._paused_until = 0.0
+
+    def ensure_max_in_flight(self, max_in_flight: int):
+        """Allows at least {max_in_flight} requests in flight from now on, e.g. because the connection pool has grown."""
+        with self._lock:
+            extra = max_in_flight - self.max_in_flight
+            if extra <= 0:
+                return
+            self.max_in_flight = max_in_flight
+            for _ in range(extra):
+                self._in_flight.release()
+            # event loops get a new semaphore, the requests holding the old one release it when they're done
+            self._async_in_flight = WeakKeyDictionary()
+
+    def pause(self, seconds: float):
+        """Holds back every request for {seconds}, e.g. because the server said we're making too many."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _pause_remaining(self) -> float:
+        with self._lock:
+            return self._paused_until - time.monotonic()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    @contextmanager
+    def limit(self, url: str):
+        """Blocks until a request to {url} may be made. Yields the number of seconds spent waiting for a token."""
+        with self._in_flight:
+            waited = self.bucket(url).acquire()
+            # the pause may be extended while we're waiting
+            pause = self._pause_remaining()
+            while pause > 0:
+                time.sleep(pause)
+                waited += pause
+                pause = self._pause_remaining()
+            yield waited
+
+    @asynccontextmanager
+    async def limit_async(self, url: str):
+        """Like limit, but waits without blocking the event loop. Coroutines share the token buckets with threads,
+        but have a separate cap on the number of requests in flight for each event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_in_flight:
+                self._async_in_flight[loop] = asyncio.Semaphore(self.max_in_flight)
+            in_flight = self._async_in_flight[loop]
+        async with in_flight:
+            wait = self.bucket(url).reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            pause = self._pause_remaining()
+            while pause > 0:
+                await asyncio.sleep(pause)
+                wait += pause
+                pause = self._pause_remaining()
+            yield wait
@@ -0,0 +1,72 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+from bballer.scrapers.transport import Response, aiohttp
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECS = 1.0
+BACKOFF_CAP_SECS = 60.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError) + \
+               ((aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) if aiohttp else ())
+# lost connections, timeouts and truncated responses, which are likely to go away when the request is made again
+PERMANENT_ERRORS = (requests.exceptions.SSLError,) + ((aiohttp.ClientSSLError,) if aiohttp else ())
+# connection errors which won't, as a bad certificate stays bad
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Returns the number of seconds to wait according to a Retry-After header, which holds either a number of seconds
+    or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is tried again, and how long to wait before doing so.
+    The wait grows exponentially with every attempt up to {cap} seconds, with full jitter so that threads which failed
+    at the same time don't all retry at the same time. A Retry-After header sent by the server takes precedence, but
+    the request is given up when it asks to wait longer than {cap} seconds, as everyone would have to wait that long.
+    """
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, base: float = BACKOFF_BASE_SECS, cap: float = BACKOFF_CAP_SECS,
+                 statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self.statuses = statuses
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    def next_delay(self, attempt: int, response: Response = None, error: Exception = None) -> Optional[float]:
+        """
+        @param attempt: the number of the attempt which just failed, starting at 0.
+        @param response: the response to the attempt, if there was one.
+        @param error: the error raised by the attempt, if there was one.
+        @return: the number of seconds to wait before trying again, or None if the request should not be retried.
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if error is not None:
+            transient = isinstance(error, RETRY_ERRORS) and not isinstance(error, PERMANENT_ERRORS)
+            return self.backoff(attempt) if transient else None
+        if response.status_code not in self.statuses:
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is None:
+            return self.backoff(attempt)
+        return retry_after if retry_after <= self.cap else None
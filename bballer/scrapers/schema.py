@@ -0,0 +1,83 @@
+import re
+from typing import Any, Callable, Dict, Optional
+
+INTEGER = re.compile(r"\s*[+-]?\d+\s*")
+DECIMAL = re.compile(r"\s*[+-]?(\d+\.\d*|\.\d+)([eE][+-]?\d+)?\s*")
+# the text of cells holding numbers, e.g. "-3", "+12", ".523" or "1.000"
+
+
+def to_number(text: str):
+    """Returns an int if {text} is an integer, a float if it is a decimal number, and {text} itself otherwise."""
+    if INTEGER.fullmatch(text):
+        return int(text)
+    if DECIMAL.fullmatch(text):
+        return float(text)
+    return text
+
+
+def to_int(text: str):
+    if INTEGER.fullmatch(text):
+        return int(text)
+    return to_number(text)
+
+
+def to_float(text: str):
+    if DECIMAL.fullmatch(text) or INTEGER.fullmatch(text):
+        return float(text)
+    return text
+
+
+def to_str(text: str) -> str:
+    return text
+
+
+class Column:
+    """
+    A column of a table, read from the cells with the attribute data-stat="{stat}".
+    @param stat: the value of the data-stat attribute.
+    @param convert: turns the text of a cell into the value of the field, e.g. to_int. It is not called for empty or
+    missing cells, which are None, and returns the text itself if it can't be converted.
+    @param attr: if specified, the value of this attribute of the cell is read instead of its text.
+    """
+
+    def __init__(self, stat: str, convert: Callable[[str], Any] = to_number, attr: str = None):
+        self.stat = stat
+        self.convert = convert
+        self.attr = attr
+
+    def __repr__(self):
+        return f"Column({self.stat})"
+
+
+class Schema:
+    """
+    The columns a model is read from, by the name of the field they fill in, e.g.
+    Schema(points=Column("pts", to_int), effective_fg_percentage=Column("efg_pct", to_float)).
+    The columns are compiled into a decoder once, so decoding a row is a single loop over its cells.
+    """
+
+    def __init__(self, **columns: Column):
+        self.columns = columns
+        self._decoders = tuple((name, column.stat, column.attr, column.convert) for name, column in columns.items())
+
+    def decode(self, stats) -> Dict[str, Any]:
+        """
+        Returns the value of every column in a row, by field name.
+        @param stats: the row, a DataStatRow.
+        """
+        text = stats.text
+        values: Dict[str, Optional[Any]] = {}
+        for name, stat, attr, convert in self._decoders:
+            value = text(stat, attr)
+            values[name] = convert(value) if value else None
+        return values
+
+    def fill(self, obj, stats):
+        """Sets the fields of {obj} to the values of the columns in the row {stats}, returns {obj}."""
+        for name, value in self.decode(stats).items():
+            setattr(obj, name, value)
+        return obj
+
+    def empty(self) -> Dict[str, None]:
+        """Returns None for every field, for rows which don't have these columns."""
+        return dict.fromkeys(self.columns)
@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures import Future
+from threading import Lock
+from typing import Dict, Hashable, Callable, TypeVar, Awaitable
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Lets threads asking for the same key at the same time share a single call: the first one does the work, the others
+    wait for its result (or its exception).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Like SingleFlight, but for coroutines. A caller which is cancelled does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args) -> T:
+        # tasks belong to an event loop, so calls are only shared within the same loop
+        key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
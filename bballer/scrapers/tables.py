@@ -0,0 +1,221 @@
+import re
+from bisect import bisect_right
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple, Union, Iterator
+
+TABLE_START = re.compile(r'<table\b[^>]*?\sid="([^"]+)"[^>]*>', re.IGNORECASE)
+TABLE_END = re.compile(r"</table\s*>", re.IGNORECASE)
+COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+ASCII_SPACES = " \n\t\f\r"
+MULTI_VALUED_ATTRIBUTES = frozenset({"class", "rel", "rev", "headers", "accesskey", "accept-charset", "dropzone"})
+# attributes BeautifulSoup splits into a list of values
+VOID_ELEMENTS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+                           "source", "track", "wbr"})
+IMPLICITLY_CLOSED = {
+    "td": {"td", "th"},
+    "th": {"td", "th"},
+    "tr": {"tr", "td", "th"},
+    "thead": {"thead", "tbody", "tfoot", "tr", "td", "th", "caption", "colgroup"},
+    "tbody": {"thead", "tbody", "tfoot", "tr", "td", "th", "caption", "colgroup"},
+    "tfoot": {"thead", "tbody", "tfoot", "tr", "td", "th", "caption", "colgroup"},
+}
+# start tags which end the elements in their set if one of those is still open, e.g. <td>1<td>2
+
+
+class Text(str):
+    """A text node. Like BeautifulSoup's strings, it has no name."""
+    name = None
+
+
+def _matches(value, expected) -> bool:
+    if expected is True:
+        return value is not None
+    if value is None:
+        return False
+    if callable(expected) and not isinstance(expected, re.Pattern):
+        return expected(value)
+    values = value if isinstance(value, list) else [value]
+    if isinstance(value, list):
+        values = values + [" ".join(value)]
+    if isinstance(expected, re.Pattern):
+        return any(expected.search(v) for v in values)
+    return expected in values
+
+
+class Element:
+    """
+    A table, or an element inside one, extracted without building a BeautifulSoup tree. It supports the part of the
+    Tag interface which the scrapers use on tables: attributes, text, find, find_all, find_parent and siblings.
+    """
+    __slots__ = ("name", "attrs", "contents", "parent")
+
+    def __init__(self, name: str, attrs: Dict[str, Union[str, List[str]]], parent: "Element" = None):
+        self.name = name
+        self.attrs = attrs
+        self.contents: List[Union["Element", Text]] = []
+        self.parent = parent
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def __repr__(self):
+        return f"<{self.name} {self.attrs}>"
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    @property
+    def children(self) -> Iterator[Union["Element", Text]]:
+        return iter(self.contents)
+
+    @property
+    def descendants(self) -> Iterator[Union["Element", Text]]:
+        for child in self.contents:
+            yield child
+            if isinstance(child, Element):
+                yield from child.descendants
+
+    @property
+    def previous_siblings(self) -> Iterator[Union["Element", Text]]:
+        if self.parent is None:
+            return iter(())
+        siblings = self.parent.contents
+        return reversed(siblings[:siblings.index(self)])
+
+    @property
+    def next_siblings(self) -> Iterator[Union["Element", Text]]:
+        if self.parent is None:
+            return iter(())
+        siblings = self.parent.contents
+        return iter(siblings[siblings.index(self) + 1:])
+
+    def get_text(self) -> str:
+        return "".join([node for node in self.descendants if isinstance(node, Text)])
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    @property
+    def string(self) -> Optional[str]:
+        if len(self.contents) != 1:
+            return None
+        child = self.contents[0]
+        return child if isinstance(child, Text) else child.string
+
+    def _is_match(self, name, attrs, string) -> bool:
+        if name is not None and (self.name != name if isinstance(name, str) else self.name not in name):
+            return False
+        if any(not _matches(self.attrs.get(key), expected) for key, expected in attrs.items()):
+            return False
+        return string is None or _matches(self.string, string)
+
+    def find_all(self, name=None, attrs=None, recursive=True, string=None, limit=None, class_=None, **kwargs):
+        attrs = dict(attrs or {}, **kwargs)
+        if class_ is not None:
+            attrs["class"] = class_
+        nodes = self.descendants if recursive else self.children
+        found = []
+        for node in nodes:
+            if isinstance(node, Element) and node._is_match(name, attrs, string):
+                found.append(node)
+                if limit and len(found) == limit:
+                    break
+        return found
+
+    def find(self, name=None, attrs=None, recursive=True, string=None, **kwargs) -> Optional["Element"]:
+        found = self.find_all(name, attrs, recursive, string, limit=1, **kwargs)
+        return found[0] if found else None
+
+    def find_parent(self, name=None, attrs=None, **kwargs) -> Optional["Element"]:
+        attrs = dict(attrs or {}, **kwargs)
+        parent = self.parent
+        while parent is not None and not parent._is_match(name, attrs, None):
+            parent = parent.parent
+        return parent
+
+
+class _TableBuilder(HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("[document]", {})
+        self._open = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        closes = IMPLICITLY_CLOSED.get(tag)
+        while closes and self._open[-1].name in closes:
+            self._open.pop()
+        attributes = {}
+        for key, value in attrs:
+            value = value if value is not None else ""
+            attributes[key] = value.split() if key in MULTI_VALUED_ATTRIBUTES else value
+        element = Element(tag, attributes, self._open[-1])
+        self._open[-1].contents.append(element)
+        if tag not in VOID_ELEMENTS:
+            self._open.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._open.pop()
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._open) - 1, 0, -1):
+            if self._open[i].name == tag:
+                del self._open[i:]
+                return
+
+    def handle_data(self, data):
+        if not data.strip(ASCII_SPACES):
+            # like BeautifulSoup with lxml or html.parser, whitespace between tags is collapsed
+            data = "\n" if "\n" in data else " "
+        contents = self._open[-1].contents
+        if contents and isinstance(contents[-1], Text):
+            contents[-1] = Text(contents[-1] + data)
+        else:
+            contents.append(Text(data))
+
+
+def parse_table(markup: str) -> Optional[Element]:
+    """Builds the table in {markup}, which starts with the table's start tag."""
+    builder = _TableBuilder()
+    builder.feed(markup)
+    builder.close()
+    return builder.root.find("table")
+
+
+class TableIndex:
+    """
+    The tables of a page by id, found by scanning the page's markup rather than parsing it. Tables embedded in HTML
+    comments are found the same way, and kept apart from the ones which are part of the page. A table is only built
+    when it is asked for, and only once.
+    """
+
+    def __init__(self, page: Union[str, bytes]):
+        self._page = page.decode("utf-8", "replace") if isinstance(page, bytes) else page
+        comments = [(m.start(), m.end()) for m in COMMENT.finditer(self._page)]
+        comment_starts = [start for start, _ in comments]
+        self._locations: Dict[bool, Dict[str, Tuple[int, int]]] = {False: {}, True: {}}
+        # commented -> table id -> start and end of the table's markup, in document order
+        for match in TABLE_START.finditer(self._page):
+            i = bisect_right(comment_starts, match.start()) - 1
+            commented = i >= 0 and match.start() < comments[i][1]
+            end = TABLE_END.search(self._page, match.end())
+            location = (match.start(), end.end() if end else len(self._page))
+            self._locations[commented].setdefault(match.group(1), location)
+        self._tables: Dict[Tuple[int, int], Element] = {}
+
+    def ids(self, commented: bool = False) -> List[str]:
+        return list(self._locations[commented])
+
+    def get(self, id_regex, commented: bool = False) -> Optional[Element]:
+        """Returns the first table whose id fully matches the regular expression {id_regex}, or None."""
+        pattern = re.compile(id_regex)
+        for id_, location in self._locations[commented].items():
+            if pattern.fullmatch(id_):
+                if location not in self._tables:
+                    start, end = location
+                    self._tables[location] = parse_table(self._page[start:end])
+                return self._tables[location]
+        return None
@@ -0,0 +1,196 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Mapping, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional, AsyncDownload falls back to running a Transport in threads
+    aiohttp = None
+
+try:
+    import brotli
+except ImportError:  # both requests and aiohttp can decode brotli, but only when it is installed
+    brotli = None
+
+POOL_SIZE = 16
+# Number of keep-alive connections kept open per host. BulkScraper uses as many worker threads by default.
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+TIMEOUT = (10.0, 30.0)
+# Seconds to wait for a connection, and for the server to send more of the page. A stalled request fails with a timeout
+# then, which is retried, instead of holding its connection and its rate limiter slot forever.
+
+
+@dataclass
+class Response:
+    url: str
+    status_code: int
+    content: bytes
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.headers = CaseInsensitiveDict(self.headers)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class Transport:
+    """
+    Performs the actual HTTP requests for Download. Subclass this to fetch pages from somewhere else.
+    """
+    throttled = True
+    # Whether requests are subject to the rate limiter, which is pointless for pages served from local files.
+    cached = True
+    # Whether the disk cache is used for the pages, which is pointless, and not reproducible, for pages on disk already.
+
+    def get(self, url: str, headers: Mapping[str, str] = None) -> Response:
+        raise NotImplementedError
+
+    def ensure_pool_size(self, pool_size: int):
+        """Makes room for at least {pool_size} requests at the same time, for transports which have a limit."""
+        pass
+
+    def close(self):
+        pass
+
+
+class SessionTransport(Transport):
+    """
+    Transport which shares one requests session between all threads, so connections are reused instead of doing a new
+    TCP and TLS handshake for every page.
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, timeout: Tuple[float, float] = TIMEOUT):
+        """
+        @param timeout: the seconds to wait for a connection, and for the server to send more of the page.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._adapter = None
+        self._mount()
+
+    def _mount(self):
+        # pool_block makes threads wait for a free connection rather than opening (and discarding) extra ones, so
+        # there have to be as many connections as threads downloading pages, see ensure_pool_size
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, pool_block=True)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        replaced, self._adapter = self._adapter, adapter
+        if replaced is not None:
+            # its connections would stay open until it's garbage collected otherwise
+            replaced.close()
+
+    def ensure_pool_size(self, pool_size: int):
+        """Keeps up to {pool_size} connections open from now on, if that is more than before."""
+        if pool_size > self.pool_size:
+            self.pool_size = pool_size
+            self._mount()
+
+    def get(self, url: str, headers: Mapping[str, str] = None) -> Response:
+        r = self._session.get(url, headers=headers, timeout=self.timeout)
+        return Response(url=url, status_code=r.status_code, content=r.content, headers=r.headers)
+
+    def close(self):
+        self._session.close()
+
+
+class AsyncTransport:
+    """
+    Performs the actual HTTP requests for Download.download_async.
+    """
+    throttled = True
+    cached = True
+
+    async def get(self, url: str, headers: Mapping[str, str] = None) -> Response:
+        raise NotImplementedError
+
+    async def close(self):
+        """Closes the connections opened on the running event loop. The transport can still be used afterwards."""
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Transport backed by an aiohttp session, which keeps up to {pool_size} connections open without needing a thread for
+    each request. Requires aiohttp to be installed.
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, timeout: Tuple[float, float] = TIMEOUT):
+        """
+        @param timeout: the seconds to wait for a connection, and for the server to send more of the page, like for
+        SessionTransport.
+        """
+        if aiohttp is None:
+            raise ImportError("AiohttpTransport requires aiohttp to be installed.")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+
+    async def _get_session(self):
+        # a session can only be used on the event loop it was created on
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_size)
+            connect, read = self.timeout
+            # no limit on the whole request, a large page which keeps arriving is fine
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+            # a session left open on a loop which has finished can't be closed anymore, see close
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                  headers={"Accept-Encoding": ACCEPT_ENCODING})
+            self._loop = loop
+        return self._session
+
+    async def get(self, url: str, headers: Mapping[str, str] = None) -> Response:
+        async with (await self._get_session()).get(url, headers=headers) as r:
+            content = await r.read()
+            return Response(url=url, status_code=r.status, content=content, headers=r.headers)
+
+    async def close(self):
+        """Closes the session, which has to happen on the event loop it was used on, e.g. by using the transport as an
+        async context manager, or through Download.async_session."""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+
+class ThreadedTransport(AsyncTransport):
+    """
+    Runs a synchronous Transport in the event loop's default executor. Used when aiohttp is not installed.
+    @param transport: the transport to run, by default the one Download is currently using.
+    """
+
+    def __init__(self, transport: Transport = None):
+        self.transport = transport
+
+    @property
+    def throttled(self):
+        from bballer.scrapers.download import Download
+        return (self.transport or Download.transport).throttled
+
+    @property
+    def cached(self):
+        from bballer.scrapers.download import Download
+        return (self.transport or Download.transport).cached
+
+    async def get(self, url: str, headers: Mapping[str, str] = None) -> Response:
+        from bballer.scrapers.download import Download
+        transport = self.transport or Download.transport
+        return await asyncio.get_running_loop().run_in_executor(None, transport.get, url, headers)
+
+
+def default_async_transport() -> AsyncTransport:
+    return AiohttpTransport() if aiohttp else ThreadedTransport()
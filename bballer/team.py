@@ -1,5 +1,6 @@
 from bballer.scrapers.Search import Search
 from bballer.scrapers.TeamScraper import TeamPageScraper
+from bballer.scrapers.base import scrape_async
 
 
 def get_by_name(name: str):
@@ -14,6 +15,10 @@ def get_by_code(code: str):
     return TeamPageScraper(code).get_content()
 
 
+async def get_by_code_async(code: str):
+    return await scrape_async(TeamPageScraper.get_url(code), lambda content: TeamPageScraper(code, content).get_content())
+
+
 def get_by_url(url: str):
     return TeamPageScraper(url).get_content()
 
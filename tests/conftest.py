@@ -0,0 +1,23 @@
+import pytest
+
+from bballer.scrapers.download import Download
+from bballer.scrapers.transport import ThreadedTransport
+
+
+@pytest.fixture
+def use_transport():
+    """
+    Returns a function which makes Download fetch pages through a stand-in transport until the end of the test, e.g.
+    use_transport(ResourceTransport({url: "cavs.html"})). download_async uses it too, unless another async transport is
+    given. The original transports, and an empty memory cache, are back after the test.
+    """
+    original, original_async = Download.transport, Download.async_transport
+
+    def use(transport, async_transport=None):
+        Download.set_transport(transport)
+        Download.set_async_transport(async_transport or ThreadedTransport(transport))
+        return transport
+
+    yield use
+    Download.set_transport(original)
+    Download.set_async_transport(original_async)
@@ -1,7 +1,32 @@
+import asyncio
+import concurrent.futures
 import logging
+import pickle
 
+import pytest
+
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
 from bballer.scrapers.misc import BulkScraper
-from tests.scrapers.utils import get_resource
+from tests.scrapers.utils import ResourceTransport, as_data, get_resource
+
+
+PATHS = [get_resource(fn) for fn in ["lebron_james.html", "carmelo_anthony.html", "dj_mbenga.html"]]
+
+
+@pytest.fixture
+def old_shutdown(monkeypatch):
+    """Makes process pools reject cancel_futures, which ProcessPoolExecutor.shutdown only takes since Python 3.9."""
+    shutdown = concurrent.futures.ProcessPoolExecutor.shutdown
+    monkeypatch.setattr(concurrent.futures.ProcessPoolExecutor, "shutdown",
+                        lambda self, wait=True: shutdown(self, wait))
+
+
+@pytest.fixture
+def copies(use_transport):
+    """Serves the same page under 20 different URLs, more than a stream has in flight at once."""
+    urls = [f"https://www.basketball-reference.com/players/c/copy{i:02d}.html" for i in range(20)]
+    use_transport(ResourceTransport({url: "lebron_james.html" for url in urls})).throttled = False
+    return urls
 
 
 class TestBulkScraper:
@@ -17,3 +42,68 @@ class TestBulkScraper:
         bulk_scr = BulkScraper(map(get_resource, ["lebron_james.html", "lebron_james.html"]))
         players = list(bulk_scr.scrape_all())
         assert len(players) == 1
+
+    def test_scrape_in_processes(self):
+        paths = list(map(get_resource, ["lebron_james.html", "carmelo_anthony.html", "dj_mbenga.html"]))
+        in_threads = {p.name: as_data(p) for p in BulkScraper(paths).scrape_all()}
+        in_processes = list(BulkScraper(paths, workers=2, processes=2).scrape_all())
+        assert {p.name: as_data(p) for p in in_processes} == in_threads
+
+        async def scrape():
+            return [p async for p in BulkScraper(paths, processes=2).scrape_all_async()]
+        assert {p.name: as_data(p) for p in asyncio.run(scrape())} == in_threads
+
+    def test_players_can_be_pickled(self):
+        for lazy in (False, True):
+            player = PlayerPageScraper(get_resource("lebron_james.html")).player(lazy)
+            expected = as_data(PlayerPageScraper(get_resource("lebron_james.html")).player())
+            assert as_data(pickle.loads(pickle.dumps(player))) == expected
+
+    def test_stream(self, copies):
+        consumed = []
+
+        def urls():
+            for url in copies + copies:
+                consumed.append(url)
+                yield url
+
+        stream = BulkScraper(urls(), workers=1, window=2).stream()
+        first = next(stream)
+        assert len(consumed) == 2
+        players = dict([first] + list(stream))
+        assert sorted(players) == sorted(copies)
+        assert {p.name for p in players.values()} == {"LeBron James"}
+
+    def test_scrape_all_async_is_bounded(self, copies):
+        consumed = []
+
+        def urls():
+            for url in copies + copies:
+                consumed.append(url)
+                yield url
+
+        async def scrape():
+            players = BulkScraper(urls(), workers=1, window=2).scrape_all_async()
+            first = await players.__anext__()
+            assert len(consumed) == 2
+            return [first] + [p async for p in players]
+        players = asyncio.run(scrape())
+        assert len(players) == len(copies)
+        assert len(consumed) == 2 * len(copies)
+
+    def test_stream_in_processes(self):
+        paths = [get_resource(fn) for fn in ["lebron_james.html", "carmelo_anthony.html", "dj_mbenga.html"]]
+        players = dict(BulkScraper(paths, processes=2, window=2).stream())
+        assert {url: as_data(p) for url, p in players.items()} == \
+               {url: as_data(PlayerPageScraper(url).get_content()) for url in paths}
+
+    def test_stopping_early_in_processes(self, old_shutdown):
+        async def first():
+            players = BulkScraper(PATHS, workers=1, processes=1).scrape_all_async()
+            player = await players.__anext__()
+            await players.aclose()
+            return player
+        assert asyncio.run(first()).name in ["LeBron James", "Carmelo Anthony", "D.J. Mbenga"]
+        stream = BulkScraper(PATHS, workers=1, processes=1, window=1).stream()
+        assert next(stream)[0] in PATHS
+        stream.close()
@@ -13,3 +13,10 @@ class TestDraftPageScraper:
         assert draft_pick.pick == 1
         assert draft_pick.years_in_league > 16
         assert draft_pick.team.name == "Cleveland Cavaliers"
+
+    def test_scrape_all_rounds(self):
+        picks = list(DraftPageScraper(get_resource("draft_2003.html")).get_content())
+        assert len(picks) == 58
+        undrafted = [pick for pick in picks if pick.player.url is None]
+        assert all([pick.years_in_league == 0 for pick in undrafted])
+        assert "Malick Badiane" in [pick.player.name for pick in undrafted]
@@ -1,11 +1,11 @@
-from collections.abc import Generator
+import pickle
 from datetime import date
 
 from bballer.models.gamelog import GameLog
 from bballer.models.player import DraftPick
 from bballer.models.stats import StatLine
 from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
-from tests.scrapers.utils import get_resource
+from tests.scrapers.utils import ResourceTransport, as_data, get_resource
 
 
 def lebron_james():
@@ -89,6 +89,24 @@ class TestPlayerPageScraper:
         gl = seasons[0].game_logs()
         assert len([game for game in gl if game.played]) == seasons[0].stats.games_played
 
+    def test_totals_rows_are_kept_per_table_id(self):
+        scr = PlayerPageScraper(get_resource("lebron_james.html"))
+        seasons = list(scr._get_regular_season_totals())
+        assert set(scr._totals_rows) == {"totals"}
+        assert len(list(scr._get_playoffs_totals())) == len(scr._totals_rows["playoffs_totals"]) > 0
+        assert [s.season for s in scr._get_regular_season_totals()] == [s.season for s in seasons]
+
+    def test_game_logs_can_be_reused(self, use_transport):
+        use_transport(ResourceTransport({
+            "https://www.basketball-reference.com/players/j/jamesle01/gamelog/2004": "lbj_gamelog_2003.html"}))
+        with open(get_resource("lebron_james.html"), "rb") as f:
+            lbj = PlayerPageScraper("https://www.basketball-reference.com/players/j/jamesle01.html", f.read()).player()
+        season = lbj.seasons[0]
+        logs = season.game_logs()
+        assert season.game_logs() is logs
+        assert len(list(logs)) == len(list(logs)) > 0
+        assert as_data(pickle.loads(pickle.dumps(season)).game_logs()) == as_data(logs)
+
     def test_all_star(self):
         erving = PlayerPageScraper(get_resource("julius_erving.html")).get_content()
         assert len([season for season in list(erving.seasons) if season.all_star]) == 11
@@ -125,10 +143,12 @@ class TestPlayerPageScraper:
         assert dp.team.url == "https://www.basketball-reference.com/teams/CLE"
         assert dp.year == 2003
 
-    def test_seasons_and_playoffs_are_generators(self):
+    def test_seasons_and_playoffs_can_be_reused(self):
         lbj = lebron_james()
-        assert isinstance(lbj.seasons, Generator)
-        assert isinstance(lbj.playoffs, Generator)
+        assert list(lbj.seasons) == list(lbj.seasons)
+        assert len(lbj.playoffs) == len(list(lbj.playoffs)) > 0
+        assert lbj.seasons[0] is next(lbj.seasons)
+        assert lbj.seasons[-1].season == 2020
 
     def test_contract(self):
         james = lebron_james()
@@ -212,3 +232,38 @@ class TestPlayerPageScraper:
         first_playoffs = next(lbj.playoffs)
         assert first_playoffs.stats.shooting_data.avg_distance == 12.1
         assert first_playoffs.stats.shooting_data.dunks_made == 13
+
+
+class TestLazyPlayer:
+
+    def test_sections_are_loaded_on_access(self):
+        scr = PlayerPageScraper(get_resource("lebron_james.html"))
+        lbj = scr.player(lazy=True)
+        assert lbj.id == "lebron_james"
+        assert lbj.date_of_birth == date(1984, 12, 30)
+        assert "seasons" not in vars(lbj)
+        assert scr._totals_rows == {}
+        assert lbj.height_in == 81
+        assert "_weight" in vars(lbj)
+        assert lbj == lebron_james()
+
+    def test_materialize(self):
+        lbj = PlayerPageScraper(get_resource("lebron_james.html")).player(lazy=True).materialize()
+        assert lbj._load is None
+        assert as_data(lbj) == as_data(lebron_james())
+
+    def test_eager_player_is_materialized(self):
+        lbj = lebron_james()
+        assert lbj._load is None
+        assert lbj.materialize() is lbj
+
+
+class TestSeasonIndex:
+
+    def test_joins(self):
+        scr = PlayerPageScraper(get_resource("lebron_james.html"))
+        seasons = list(scr._get_regular_season_totals())
+        assert [s.stats.advanced.season for s in seasons] == [s.season for s in seasons]
+        assert all(s.stats.shooting_data for s in seasons)
+        assert scr._get_advanced_index().get(2004, "CLE").get("team_id") == "CLE"
+        assert scr._get_advanced_index().get(1990) is None
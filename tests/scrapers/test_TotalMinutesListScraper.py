@@ -1,4 +1,16 @@
+import pytest
+
 from bballer.scrapers.misc import TotalMinutesScraper
+from tests.scrapers.utils import get_resource
+
+URLS = ["https://www.basketball-reference.com/players/a/" + _id for _id in
+        ["abdulma02.html", "abdulta01.html", "abdulta01.html", "abdulta01.html", "abdursh01.html", "allenra02.html",
+         "alstora01.html"]]
+
+
+def totals_page():
+    with open(get_resource("nba_2000_totals.html"), "rb") as f:
+        return f.read()
 
 
 class TestTotalMinutesListScraper:
@@ -7,3 +19,18 @@ class TestTotalMinutesListScraper:
         urls = s.get_player_urls()
         assert len(urls) > 10
         assert all([url.startswith("https://www.basketball-reference.com/players/") for url in urls])
+
+    @pytest.mark.parametrize("fast_tables", [False, True])
+    def test_scrape_saved_page(self, fast_tables):
+        TotalMinutesScraper.use_fast_tables(fast_tables)
+        try:
+            assert TotalMinutesScraper(2000, totals_page()).get_player_urls() == URLS
+        finally:
+            TotalMinutesScraper.use_fast_tables(False)
+
+    def test_region_holds_the_table(self, monkeypatch):
+        # the whole page gives the same players as the region, so the region doesn't leave any of them out
+        scr = TotalMinutesScraper(2000, totals_page())
+        assert [table.attrs["id"] for table in scr._parsed.find_all("table")] == ["totals_stats"]
+        monkeypatch.setattr(TotalMinutesScraper, "regions", ())
+        assert TotalMinutesScraper(2000, totals_page()).get_player_urls() == URLS
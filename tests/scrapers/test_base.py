@@ -1,5 +1,16 @@
-from bballer.scrapers.base import Scraper
-from tests.scrapers.utils import get_resource
+import gc
+import weakref
+
+import pytest
+from bs4 import SoupStrainer
+
+from bballer.scrapers.DraftPageScraper import DraftPageScraper
+from bballer.scrapers.GameLogScraper import GameLogScraper
+from bballer.scrapers.PlayerListScraper import PlayerListScraper
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.TeamScraper import TeamPageScraper
+from bballer.scrapers.base import Scraper, DataStatRow, get_data_stat_in_element
+from tests.scrapers.utils import as_data, assert_detached, get_resource
 
 
 class TestBaseScraper():
@@ -8,3 +19,61 @@ class TestBaseScraper():
         scr = Scraper(get_resource("lebron_james.html"))
         table = scr.get_commented_table_with_id("contracts_.*")
         assert table["id"] == "contracts_lal"
+
+    def test_commented_table_is_memoized(self):
+        scr = Scraper(get_resource("lebron_james.html"))
+        table = scr.get_commented_table_with_id("shooting")
+        assert table["id"] == "shooting"
+        assert scr.get_commented_table_with_id("shooting") is table
+
+    def test_commented_table_id_fully_matches(self):
+        scr = Scraper(get_resource("lebron_james.html"))
+        assert scr.get_commented_table_with_id("totals")["id"] == "totals"
+        assert scr.get_commented_table_with_id("playoffs_totals")["id"] == "playoffs_totals"
+        assert scr.get_commented_table_with_id("all_salaries")["id"] == "all_salaries"
+        assert scr.get_commented_table_with_id("otals") is None
+
+    def test_data_stat_row(self):
+        scr = Scraper(get_resource("lebron_james.html"))
+        for table_id in ["totals", "advanced", "shooting", "all_salaries"]:
+            for row in scr.get_commented_table_with_id(table_id).find_all("tr"):
+                stats = DataStatRow(row)
+                for cell in row.find_all(attrs={"data-stat": True}):
+                    stat_name = cell["data-stat"]
+                    assert stats.get(stat_name) == get_data_stat_in_element(stat_name, row)
+                    if "csk" in cell.attrs:
+                        assert stats.get(stat_name, "csk") == get_data_stat_in_element(stat_name, row, "csk")
+                    assert stats.child(stat_name) is get_data_stat_in_element(stat_name, row, return_first_child=True)
+                assert stats.get("no_such_stat") is None
+
+    def test_regions(self):
+        for scraper, fn in [(DraftPageScraper, "draft_2003.html"), (PlayerListScraper, "w.html")]:
+            whole_page = type("WholePage", (scraper,), {"regions": ()})
+            scr = scraper(get_resource(fn))
+            assert scr.find("div", id="footer") is None
+            assert list(scr.get_content()) == list(whole_page(get_resource(fn)).get_content())
+
+    def test_several_regions(self):
+        class InfoScraper(Scraper):
+            regions = (SoupStrainer("div", id="info"), SoupStrainer("link", rel="canonical"))
+        scr = InfoScraper(get_resource("lebron_james.html"))
+        assert scr.find("link", rel="canonical")["href"].endswith("jamesle01.html")
+        assert scr.get_item_prop("name", element="h1") == "LeBron James"
+        assert scr.find("table") is None
+
+    def test_detached(self):
+        for scraper, fn in [(PlayerPageScraper, "lebron_james.html"), (GameLogScraper, "lbj_gamelog_2003.html"),
+                            (DraftPageScraper, "draft_2003.html"), (TeamPageScraper, "cavs.html")]:
+            detached = type("Detached", (scraper,), {"detached": True})
+            scr = detached(get_resource(fn))
+            content = scr.get_content()
+            assert_detached(content)
+            assert as_data(content) == as_data(scraper(get_resource(fn)).get_content())
+            with pytest.raises(ValueError):
+                scr.get_table_with_id("stats")
+
+            # the models don't keep the scraper alive
+            ref = weakref.ref(scr)
+            del scr
+            gc.collect()
+            assert ref() is None
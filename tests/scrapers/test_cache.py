@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from bballer.scrapers.cache import DiskCache, normalize_url, ttl_for, NEVER, DEFAULT_TTL_SECS, current_season, \
+    MemoryCache, decompress
+from bballer.scrapers.download import Download
+from bballer.scrapers.transport import Transport, Response
+from tests.scrapers.utils import get_resource
+
+
+class TestDiskCache:
+
+    def test_normalize_url(self):
+        assert normalize_url("HTTPS://www.Basketball-Reference.com/search/search.fcgi?b=2&a=1#top") == \
+               "https://www.basketball-reference.com/search/search.fcgi?a=1&b=2"
+
+    def test_ttl(self):
+        assert ttl_for("https://www.basketball-reference.com/players/j/jamesle01/gamelog/2004") is NEVER
+        assert ttl_for("https://www.basketball-reference.com/leagues/NBA_2000_totals.html") is NEVER
+        assert ttl_for("https://www.basketball-reference.com/boxscores/201611010CLE.html") is NEVER
+        assert ttl_for("https://www.basketball-reference.com/search/search.fcgi?search=Kobe") == 0
+        assert ttl_for(f"https://www.basketball-reference.com/teams/CLE/{current_season()}.html") == DEFAULT_TTL_SECS
+        assert ttl_for("https://www.basketball-reference.com/players/j/jamesle01.html") == DEFAULT_TTL_SECS
+
+    def test_current_season(self):
+        assert current_season(date(2020, 3, 1)) == 2020
+        assert current_season(date(2020, 11, 1)) == 2021
+
+    def test_set_and_get(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        url = "https://www.basketball-reference.com/players/j/jamesle01.html"
+        assert cache.get(url) is None
+        cache.set(url, b"<html></html>")
+        assert cache.get(url) == b"<html></html>"
+        assert DiskCache(str(tmp_path)).get(url + "#bio") == b"<html></html>"
+        cache.clear()
+        assert cache.get(url) is None
+
+    def test_expiry(self, tmp_path):
+        cache = DiskCache(str(tmp_path), ttl=lambda url: 1)
+        url = "https://www.basketball-reference.com/players/j/jamesle01.html"
+        cache.set(url, b"<html></html>")
+        entry = cache.load(url)
+        entry.fetched_at = time.time() - 2
+        assert not entry.is_fresh(1)
+        assert DiskCache(str(tmp_path), ttl=lambda url: 0).get(url) is None
+
+    def test_compressed(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        url = "https://www.basketball-reference.com/players/j/jamesle01.html"
+        with open(get_resource("lebron_james.html"), "rb") as f:
+            content = f.read()
+        cache.set(url, content)
+        assert os.path.getsize(cache._path(url)) < len(content) / 5
+        assert cache.get(url) == content
+
+    def test_uncompressed_entry(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        url = "https://www.basketball-reference.com/players/j/jamesle01.html"
+        path = cache._path(url)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"<html></html>")
+        with open(path + ".json", "w") as f:
+            json.dump({"url": url, "fetched_at": time.time()}, f)
+        assert cache.get(url) == b"<html></html>"
+
+    def test_search_results_are_not_stored(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        url = "https://www.basketball-reference.com/search/search.fcgi?search=Kobe"
+        cache.set(url, b"<html></html>")
+        assert cache.load(url) is None
+
+    def test_download_uses_disk_cache(self, tmp_path):
+        url = "https://www.basketball-reference.com/leagues/NBA_1990_totals.html"
+        DiskCache(str(tmp_path)).set(url, b"<html>cached</html>")
+        Download.use_disk_cache(str(tmp_path))
+        try:
+            assert Download.download(url) == b"<html>cached</html>"
+        finally:
+            Download.use_disk_cache(None)
+
+
+class TestMemoryCache:
+
+    def test_byte_budget(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        cache.set("c", b"1")
+        assert cache.get("a") is None
+        assert cache.get("b") == b"12345"
+        assert cache.size == 6
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "entries": 2, "bytes": 6, "max_bytes": 10}
+
+    def test_lru(self):
+        cache = MemoryCache(max_bytes=3, policy="lru")
+        for key in "abc":
+            cache.set(key, b"1")
+        cache.get("a")
+        cache.set("d", b"1")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+
+    def test_lfu(self):
+        cache = MemoryCache(max_bytes=3, policy="lfu")
+        for key in "abc":
+            cache.set(key, b"1")
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        cache.set("d", b"1")
+        assert cache.get("c") is None
+        assert cache.get("a") == cache.get("b") == cache.get("d") == b"1"
+
+    def test_admission(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set("https://www.basketball-reference.com/search/search.fcgi?search=Kobe", b"1")
+        cache.set("https://www.basketball-reference.com/players/j/jamesle01.html", b"12345678901")
+        assert cache.stats()["entries"] == 0
+        cache = MemoryCache(max_bytes=10, exclude=[r"/players/"])
+        cache.set("https://www.basketball-reference.com/players/j/jamesle01.html", b"1")
+        assert cache.stats()["entries"] == 0
+
+    def test_memory_ttl(self):
+        cache = MemoryCache()
+        url = "https://www.basketball-reference.com/players/j/jamesle01.html"
+        cache.set(url, b"1", fetched_at=time.time() - 10)
+        assert cache.get(url, ttl=5) is None
+        assert cache.get(url, ttl=60) == cache.get(url) == b"1"
+        cache.set(url, b"2")
+        assert cache.get(url, ttl=5) == b"2"
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            MemoryCache(policy="fifo")
+
+
+class VersionedTransport(Transport):
+    """Answers conditional requests for the current version with 304 Not Modified."""
+
+    def __init__(self):
+        self.version = "v1"
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == self.version:
+            return Response(url=url, status_code=304, content=b"")
+        return Response(url=url, status_code=200, content=self.version.encode(), headers={"ETag": self.version})
+
+
+class TestRevalidation:
+    url = "https://www.basketball-reference.com/players/j/jamesle01.html"
+
+    @pytest.fixture
+    def transport(self, tmp_path, use_transport):
+        transport = use_transport(VersionedTransport())
+        Download.use_disk_cache(str(tmp_path))
+        yield transport
+        Download.use_disk_cache(None)
+        Download.use_stale_while_revalidate(False)
+
+    def expire(self):
+        Download.clear_memory_cache()
+        Download.disk_cache.ttl = lambda url: 0.000001
+
+    def test_not_modified(self, transport):
+        assert Download.download(self.url) == b"v1"
+        self.expire()
+        assert Download.download(self.url) == b"v1"
+        assert transport.requests[-1]["If-None-Match"] == "v1"
+        assert Download.disk_cache.load(self.url).etag == "v1"
+
+    def test_modified(self, transport):
+        Download.download(self.url)
+        self.expire()
+        transport.version = "v2"
+        assert Download.download(self.url) == b"v2"
+        assert Download.disk_cache.load(self.url).content == b"v2"
+
+    def test_async_disk_access_is_off_the_loop(self, transport, monkeypatch):
+        threads = []
+        events = []
+
+        def recording(method):
+            def record(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return method(*args, **kwargs)
+            return record
+
+        for name in ("load", "set_compressed"):
+            monkeypatch.setattr(Download.disk_cache, name, recording(getattr(Download.disk_cache, name)))
+        Download.add_observer(events.append)
+        try:
+            # asyncio.run runs the event loop on this thread
+            assert asyncio.run(Download.download_async(self.url)) == b"v1"
+            Download.clear_memory_cache()
+            assert asyncio.run(Download.download_async(self.url)) == b"v1"
+        finally:
+            Download.remove_observer(events.append)
+        assert len(threads) == 3 and threading.current_thread() not in threads
+        assert [event.source for event in events] == ["network", "disk"]
+
+    def test_stale_while_revalidate(self, transport):
+        Download.download(self.url)
+        self.expire()
+        transport.version = "v2"
+        Download.use_stale_while_revalidate()
+        assert Download.download(self.url) == b"v1"
+        deadline = time.time() + 5
+        while Download.disk_cache.load(self.url).content != b"v2" and time.time() < deadline:
+            time.sleep(0.01)
+        assert Download.disk_cache.load(self.url).content == b"v2"
+        # the refresh replaced the page in memory too
+        Download.disk_cache.ttl = lambda url: NEVER
+        assert decompress(Download.memory_cache.get(self.url)) == b"v2"
+        assert Download.download(self.url) == b"v2"
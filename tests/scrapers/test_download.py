@@ -0,0 +1,140 @@
+import asyncio
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+from bballer import player
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.download import Download
+from bballer.scrapers.pipeline import Pipeline
+from bballer.scrapers.transport import SessionTransport, AiohttpTransport, aiohttp
+from tests.scrapers.utils import ResourceTransport
+
+ANTHONY_URL = "https://www.basketball-reference.com/players/a/anthoca01.html"
+
+
+@pytest.fixture
+def transport(use_transport):
+    return use_transport(ResourceTransport({ANTHONY_URL: "carmelo_anthony.html"}))
+
+
+@pytest.fixture
+def server():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so the sessions hold on to their connections
+
+        def do_GET(self):
+            if self.path == "/slow":
+                # longer than the read timeout of the tests, which hang up before anything is sent
+                time.sleep(0.5)
+                self.close_connection = True
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestDownload:
+
+    def test_transport(self, transport):
+        anthony = player.get_by_id("anthoca01")
+        assert anthony.name == "Carmelo Anthony"
+        assert transport.requested == [ANTHONY_URL]
+
+    def test_memory_cache(self, transport):
+        Download.download(ANTHONY_URL)
+        Download.download(ANTHONY_URL)
+        assert len(transport.requested) == 1
+
+    def test_http_error(self, transport):
+        with pytest.raises(requests.HTTPError):
+            Download.download("https://www.basketball-reference.com/players/x/nobody01.html")
+
+    def test_session_pool(self):
+        transport = SessionTransport(pool_size=4)
+        adapter = transport._session.get_adapter("https://www.basketball-reference.com/")
+        assert adapter._pool_maxsize == 4
+        transport.ensure_pool_size(2)
+        assert transport._session.get_adapter("https://www.basketball-reference.com/") is adapter
+        adapter.get_connection("https://www.basketball-reference.com/")
+        transport.ensure_pool_size(8)
+        assert transport._session.get_adapter("https://www.basketball-reference.com/")._pool_maxsize == 8
+        assert len(adapter.poolmanager.pools) == 0  # the replaced adapter is closed
+        transport.close()
+
+    def test_pool_follows_workers(self, use_transport):
+        original_limiter = Download.limiter
+        Download.set_rate_limit(max_in_flight=4)
+        try:
+            transport = use_transport(SessionTransport(pool_size=4))
+            assert list(Pipeline(PlayerPageScraper, fetchers=24).run([])) == []
+            assert transport.pool_size == Download.limiter.max_in_flight == 24
+        finally:
+            Download.limiter = original_limiter
+
+    def test_replaced_transport_is_closed(self, use_transport):
+        closed = []
+        first = use_transport(ResourceTransport({}))
+        first.close = lambda: closed.append(first)
+        use_transport(ResourceTransport({}))
+        assert closed == [first]
+
+    @pytest.mark.skipif(aiohttp is None, reason="aiohttp is not installed")
+    def test_aiohttp_session_is_closed_with_its_loop(self, server):
+        transport = AiohttpTransport()
+        sessions = []
+
+        async def get():
+            async with transport:
+                response = await transport.get(server)
+                sessions.append(transport._session)
+                return response.content
+
+        assert [asyncio.run(get()) for _ in range(3)] == [b"ok"] * 3
+        assert len(set(sessions)) == 3
+        assert all(session.closed for session in sessions)
+
+    @pytest.mark.skipif(aiohttp is None, reason="aiohttp is not installed")
+    def test_async_session(self, server, use_transport):
+        transport = AiohttpTransport()
+        use_transport(ResourceTransport({}), transport)
+
+        async def get():
+            async with Download.async_session():
+                async with Download.async_session():
+                    await transport.get(server)
+                session = transport._session
+                assert not session.closed
+            return session
+
+        assert asyncio.run(get()).closed
+        assert transport._session is None
+
+    def test_timeout(self, server):
+        with pytest.raises(requests.Timeout):
+            SessionTransport(timeout=(1, 0.1)).get(server + "slow")
+
+    @pytest.mark.skipif(aiohttp is None, reason="aiohttp isn't installed")
+    def test_aiohttp_timeout(self, server):
+        async def get():
+            transport = AiohttpTransport(timeout=(1, 0.1))
+            try:
+                await transport.get(server + "slow")
+            finally:
+                await transport.close()
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(get())
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.journal import Journal
+from bballer.scrapers.misc import BulkScraper
+from bballer.scrapers.pipeline import Pipeline
+from tests.scrapers.utils import as_data, get_resource
+
+PLAYERS = [get_resource(fn) for fn in ["lebron_james.html", "carmelo_anthony.html", "dj_mbenga.html"]]
+MISSING = get_resource("no_such_player.html")
+# there's no such page, so it can only be taken from a journal
+
+
+class TestJournal:
+
+    def test_record(self, tmp_path):
+        path = str(tmp_path / "job.db")
+        with Journal(path) as journal:
+            journal.record("a", {"points": 1})
+            journal.record("b", [1, 2])
+            journal.record("a", {"points": 2})
+        with Journal(path) as journal:
+            assert len(journal) == 2
+            assert "a" in journal and "c" not in journal
+            assert journal.get("a") == {"points": 2}
+            assert journal.get("c") is None
+            assert list(journal.results(["b", "c"])) == [("b", [1, 2])]
+            assert [url for url, _ in journal.results()] == ["a", "b"]
+
+    def test_bulk_scraper_resumes(self, tmp_path):
+        path = str(tmp_path / "job.db")
+        with Journal(path) as journal:
+            with pytest.raises(ValueError):
+                list(BulkScraper(PLAYERS + [MISSING], workers=1, journal=journal).stream())
+            assert PLAYERS[0] in journal and PLAYERS[1] in journal
+            lebron = journal.get(PLAYERS[0])
+            assert as_data(lebron) == as_data(PlayerPageScraper(PLAYERS[0]).get_content())
+
+        with Journal(path) as journal:
+            journal.record(MISSING, "recorded")
+            players = list(BulkScraper(PLAYERS + [MISSING], journal=journal).scrape_all())
+            assert sorted(p.name if p != "recorded" else p for p in players) == \
+                   ["Carmelo Anthony", "D.J. Mbenga", "LeBron James", "recorded"]
+
+            async def scrape():
+                return [p async for p in BulkScraper([MISSING], journal=journal).scrape_all_async()]
+            assert asyncio.run(scrape()) == ["recorded"]
+
+    def test_only_remaining_pages_are_scraped(self, tmp_path):
+        with Journal(str(tmp_path / "job.db")) as journal:
+            journal.record(MISSING, "recorded")
+            assert dict(BulkScraper([MISSING, PLAYERS[0]], journal=journal).stream())[MISSING] == "recorded"
+            assert PLAYERS[0] in journal
+
+    def test_failures(self, tmp_path):
+        with Journal(str(tmp_path / "job.db")) as journal:
+            with pytest.raises(ValueError):
+                list(BulkScraper([MISSING], journal=journal).stream())
+            assert journal.failed(MISSING) and MISSING not in journal
+            assert list(journal.failures()) == [MISSING]
+
+            # a rerun can get past the page which keeps failing, and skip it without trying it again
+            players = dict(BulkScraper([MISSING] + PLAYERS, journal=journal, skip_errors=True).stream())
+            assert sorted(players) == sorted(PLAYERS)
+            scraped = dict(Pipeline(PlayerPageScraper).run([MISSING], journal, retry_failed=False))
+            assert scraped == {}
+
+            async def scrape(**options):
+                return sorted([p.name async for p in BulkScraper([MISSING] + PLAYERS, journal=journal, **options)
+                               .scrape_all_async()])
+            assert asyncio.run(scrape(retry_failed=False)) == asyncio.run(scrape(skip_errors=True))
+            with pytest.raises(ValueError):
+                asyncio.run(scrape())
+
+            journal.record(MISSING, "recorded")
+            assert not journal.failed(MISSING) and journal.failures() == {}
+
+    def test_pipeline_resumes(self, tmp_path):
+        with Journal(str(tmp_path / "job.db")) as journal:
+            journal.record(MISSING, "recorded")
+            pipeline = Pipeline(PlayerPageScraper)
+            results = dict(pipeline.run([MISSING] + PLAYERS, journal))
+            assert results[MISSING] == "recorded"
+            assert pipeline.stats()["parse"]["items"] == len(PLAYERS)
+            assert len(journal) == 4
+            assert dict(pipeline.run(PLAYERS, journal)).keys() == set(PLAYERS)
+            assert pipeline.stats()["parse"]["items"] == len(PLAYERS)
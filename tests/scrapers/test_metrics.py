@@ -0,0 +1,77 @@
+import json
+
+import pytest
+import requests
+
+from bballer.scrapers.download import Download
+from bballer.scrapers.metrics import MetricsCollector, DownloadEvent
+from tests.scrapers.utils import ResourceTransport
+
+ANTHONY_URL = "https://www.basketball-reference.com/players/a/anthoca01.html"
+NOBODY_URL = "https://www.basketball-reference.com/players/x/nobody01.html"
+
+
+@pytest.fixture
+def metrics(use_transport):
+    use_transport(ResourceTransport({ANTHONY_URL: "carmelo_anthony.html"}))
+    collector = MetricsCollector()
+    Download.add_observer(collector)
+    yield collector
+    Download.remove_observer(collector)
+
+
+class TestMetrics:
+
+    def test_sources(self, metrics):
+        Download.download(ANTHONY_URL)
+        Download.download(ANTHONY_URL)
+        snapshot = metrics.snapshot()
+        assert snapshot["downloads"] == 2
+        assert snapshot["sources"]["network"] == 1
+        assert snapshot["sources"]["memory"] == 1
+        assert snapshot["cache"]["memory"] == {"hits": 1, "misses": 1}
+        assert snapshot["status_codes"] == {"200": 1}
+        assert snapshot["bytes"] > 0
+
+    def test_errors(self, metrics):
+        with pytest.raises(requests.HTTPError):
+            Download.download(NOBODY_URL)
+        snapshot = metrics.snapshot()
+        assert snapshot["errors"] == 1
+        assert snapshot["status_codes"] == {"404": 1}
+
+    def test_observer(self, metrics):
+        events = []
+        Download.add_observer(events.append)
+        try:
+            Download.download(ANTHONY_URL)
+        finally:
+            Download.remove_observer(events.append)
+        assert len(events) == 1
+        assert events[0].url == ANTHONY_URL
+        assert events[0].source == "network"
+        assert events[0].duration >= events[0].latency
+
+    def test_failing_observer(self, metrics):
+        def fail(event):
+            raise ValueError()
+        Download.add_observer(fail)
+        try:
+            Download.download(ANTHONY_URL)
+        finally:
+            Download.remove_observer(fail)
+        assert metrics.snapshot()["downloads"] == 1
+
+    def test_exports(self):
+        metrics = MetricsCollector()
+        metrics(DownloadEvent(url=ANTHONY_URL, source="network", status_code=200, bytes=100, retries=2))
+        assert json.loads(metrics.to_json())["retries"] == 2
+        text = metrics.to_prometheus()
+        assert 'bballer_downloads_total{source="network"} 1' in text
+        assert 'bballer_responses_total{status="200"} 1' in text
+        assert "bballer_downloaded_bytes_total 100" in text
+        # counters end in _total, the rest are gauges
+        types = dict(line.split()[2:4] for line in text.splitlines() if line.startswith("# TYPE"))
+        assert types["bballer_network_latency_seconds_total"] == "counter"
+        assert types["bballer_network_latency_seconds_max"] == "gauge"
+        assert all(name.endswith("_total") for name, kind in types.items() if kind == "counter")
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from bballer import player
+from bballer.scrapers.download import Download
+from bballer.scrapers.mirror import url_to_path, DirectoryMirror, ArchiveMirror, MirrorTransport, open_mirror
+from tests.scrapers.utils import ResourceTransport
+
+ANTHONY_URL = "https://www.basketball-reference.com/players/a/anthoca01.html"
+CAVS_URL = "https://www.basketball-reference.com/teams/CLE/"
+
+
+@pytest.fixture(params=["snapshot", "snapshot.tar"])
+def snapshot(request, tmp_path, use_transport):
+    use_transport(ResourceTransport({ANTHONY_URL: "carmelo_anthony.html", CAVS_URL: "cavs.html"}))
+    yield str(tmp_path.joinpath(request.param))
+    Download.stop_recording()
+    Download.transport.close()
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    Download.use_disk_cache(str(tmp_path.joinpath("cache")))
+    yield Download.disk_cache
+    Download.use_disk_cache(None)
+
+
+class TestMirror:
+
+    def test_url_to_path(self):
+        assert url_to_path(CAVS_URL) == "www.basketball-reference.com/teams/CLE/index.html"
+        assert url_to_path("https://www.basketball-reference.com/players/m/mbengdj01/gamelog/2008") == \
+               url_to_path("https://www.basketball-reference.com/players/m/mbengdj01/gamelog/2008/")
+        assert url_to_path("https://www.basketball-reference.com/search/search.fcgi?search=Kobe") == \
+               "www.basketball-reference.com/search/search.fcgi@search=Kobe"
+
+    def test_record_and_replay(self, snapshot):
+        Download.record_to(snapshot)
+        recorded = player.get_by_id("anthoca01")
+        Download.download(CAVS_URL)
+
+        Download.use_mirror(snapshot)
+        replayed = player.get_by_id("anthoca01")
+        assert replayed.name == recorded.name
+        assert Download.download(CAVS_URL) == Download.transport.mirror.get(CAVS_URL)
+        assert asyncio.run(player.get_by_id_async("anthoca01")).name == "Carmelo Anthony"
+
+    def test_missing_page(self, snapshot):
+        Download.use_mirror(snapshot)
+        assert Download.transport.get(ANTHONY_URL).status_code == 404
+
+    def test_replay_is_not_throttled(self, snapshot):
+        assert not MirrorTransport(DirectoryMirror(snapshot)).throttled
+
+    def test_archive_overwrite(self, tmp_path):
+        path = str(tmp_path.joinpath("snapshot.tar"))
+        archive = ArchiveMirror(path)
+        archive.put(ANTHONY_URL, b"first")
+        archive.put(ANTHONY_URL + "?" + "x" * 200, b"long name")
+        archive.put(ANTHONY_URL, b"second")
+        assert archive.get(ANTHONY_URL) == b"second"
+        archive.close()
+        reopened = ArchiveMirror(path)
+        assert reopened.get(ANTHONY_URL) == b"second"
+        assert reopened.get(ANTHONY_URL + "?" + "x" * 200) == b"long name"
+        reopened.close()
+
+    def test_record_cached_pages(self, snapshot, disk_cache):
+        Download.download(ANTHONY_URL)
+        Download.download(CAVS_URL)
+        Download.clear_memory_cache()
+        Download.download(CAVS_URL)
+        # the first page comes from the disk cache, the second from the memory cache
+        Download.record_to(snapshot)
+        served = Download.download(ANTHONY_URL), Download.download(CAVS_URL)
+        assert len(Download.transport.requested) == 2
+
+        Download.use_mirror(snapshot)
+        Download.use_disk_cache(None)
+        assert (Download.download(ANTHONY_URL), Download.download(CAVS_URL)) == served
+
+    def test_replay_skips_disk_cache(self, snapshot, disk_cache):
+        Download.record_to(snapshot)
+        Download.download(ANTHONY_URL)
+        Download.download(CAVS_URL)
+        disk_cache.clear()
+        Download.use_mirror(snapshot)
+        Download.download(CAVS_URL)
+        asyncio.run(Download.download_async(ANTHONY_URL))
+        assert disk_cache.get(CAVS_URL) is None
+        assert disk_cache.get(ANTHONY_URL) is None
+
+    def test_replay_ignores_disk_cache(self, snapshot, disk_cache):
+        disk_cache.set(CAVS_URL, b"LIVE")
+        open_mirror(snapshot).put(CAVS_URL, b"SNAPSHOT")
+        Download.use_mirror(snapshot)
+        assert Download.download(CAVS_URL) == b"SNAPSHOT"
+        Download.clear_memory_cache()
+        assert asyncio.run(Download.download_async(CAVS_URL)) == b"SNAPSHOT"
@@ -0,0 +1,53 @@
+import pytest
+from bs4.builder import builder_registry
+
+from bballer.scrapers.DraftPageScraper import DraftPageScraper
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.base import Scraper, PARSERS, resolve_parser
+from tests.scrapers.utils import PAGES, as_data, get_resource
+
+
+def scrape(scraper, fn, parser):
+    scraper.set_parser(parser)
+    try:
+        return as_data(scraper(get_resource(fn)).get_content())
+    finally:
+        scraper.set_parser(None)
+
+
+class TestParsers:
+
+    @pytest.mark.parametrize("parser", [p for p in PARSERS if p != "html.parser"])
+    @pytest.mark.parametrize("scraper,fn", PAGES)
+    def test_identical_models(self, scraper, fn, parser):
+        if builder_registry.lookup(parser) is None:
+            pytest.skip(f"{parser} is not installed")
+        assert scrape(scraper, fn, parser) == scrape(scraper, fn, "html.parser")
+
+    def test_per_scraper(self):
+        PlayerPageScraper.set_parser("html5lib")
+        try:
+            assert PlayerPageScraper.parser == "html5lib"
+            assert Scraper.parser is None
+            assert DraftPageScraper.parser is None
+        finally:
+            PlayerPageScraper.set_parser(None)
+        assert PlayerPageScraper.parser is None
+
+    def test_default(self):
+        assert Scraper.parser is None
+        assert resolve_parser(None) == "html.parser"
+
+    def test_fallback(self, monkeypatch):
+        resolve_parser.cache_clear()
+        monkeypatch.setattr(builder_registry, "lookup",
+                            lambda *features: None if features == ("lxml",) else object())
+        try:
+            assert resolve_parser("lxml") == "html5lib"
+        finally:
+            monkeypatch.undo()
+            resolve_parser.cache_clear()
+
+    def test_unknown_parser(self):
+        with pytest.raises(ValueError):
+            Scraper.set_parser("regex")
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from bballer.scrapers.DraftPageScraper import DraftPageScraper
+from bballer.scrapers.GameLogScraper import GameLogScraper
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.TeamScraper import TeamPageScraper
+from bballer.scrapers.pipeline import Pipeline
+from tests.scrapers.utils import as_data, get_resource
+
+PLAYERS = [get_resource(fn) for fn in ["lebron_james.html", "carmelo_anthony.html", "dj_mbenga.html",
+                                       "shayok.html", "tom_hawkins.html"]]
+
+
+class TestPipeline:
+
+    def test_players(self):
+        pipeline = Pipeline(PlayerPageScraper, fetchers=2, parsers=2, queue_size=1)
+        players = dict(pipeline.run(PLAYERS))
+        assert sorted(players) == sorted(PLAYERS)
+        assert as_data(players[PLAYERS[0]]) == as_data(PlayerPageScraper(PLAYERS[0]).get_content())
+        stats = pipeline.stats()
+        assert stats["fetch"]["items"] == stats["parse"]["items"] == len(PLAYERS)
+        assert 0 < stats["parse"]["utilization"] <= 1
+        assert set(pipeline.utilization()) == {"fetch", "parse"}
+
+    def test_any_scraper(self):
+        pages = {GameLogScraper: "lbj_gamelog_2003.html", DraftPageScraper: "draft_2003.html"}
+        for scraper, fn in pages.items():
+            [(url, result)] = list(Pipeline(scraper).run([get_resource(fn)]))
+            assert isinstance(result, list)
+            assert as_data(result) == as_data(scraper(get_resource(fn)).get_content())
+
+        def team_scraper(url, content):
+            return TeamPageScraper(url, content)
+        [(_, team)] = list(Pipeline(team_scraper).run([get_resource("cavs.html")]))
+        assert team.name == "Cleveland Cavaliers"
+
+    def test_processes(self):
+        players = dict(Pipeline(PlayerPageScraper, parsers=2, processes=True).run(PLAYERS[:2]))
+        assert as_data(players[PLAYERS[1]]) == as_data(PlayerPageScraper(PLAYERS[1]).get_content())
+
+    def test_errors_stop_the_pipeline(self):
+        threads = threading.active_count()
+        with pytest.raises(ValueError):
+            list(Pipeline(PlayerPageScraper, fetchers=2).run(PLAYERS[:2] + ["no_such_page.html"] + PLAYERS[2:]))
+        assert threading.active_count() == threads
+
+    def test_failing_urls(self):
+        threads = threading.active_count()
+
+        def urls():
+            yield PLAYERS[0]
+            raise KeyError("no more urls")
+
+        with pytest.raises(KeyError):
+            list(Pipeline(PlayerPageScraper, fetchers=2).run(urls()))
+        assert threading.active_count() == threads
+
+    def test_stopping_early(self):
+        threads = threading.active_count()
+        consumed = []
+
+        def urls():
+            for url in PLAYERS * 10:
+                consumed.append(url)
+                yield url
+
+        results = Pipeline(PlayerPageScraper, fetchers=1, parsers=1, queue_size=1).run(urls())
+        next(results)
+        results.close()
+        assert len(consumed) < 10
+        assert threading.active_count() == threads
+
+    def test_window(self):
+        consumed = []
+
+        def urls():
+            for url in PLAYERS * 2:
+                consumed.append(url)
+                yield url
+
+        results = Pipeline(PlayerPageScraper, fetchers=4, parsers=2, window=3).run(urls())
+        for done in range(len(PLAYERS) * 2):
+            next(results)
+            # the results consumed before the last one freed their slot
+            assert len(consumed) <= done + 3
+        results.close()
@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import pytest
+
+from bballer.scrapers.ratelimit import TokenBucket, RateLimiter
+
+
+class TestTokenBucket:
+
+    def test_burst(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_threads_wait_in_parallel(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(lambda _: bucket.acquire(), range(5)))
+        elapsed = time.monotonic() - start
+        # five requests at 20/s need 0.2s, not the sum of every thread's waiting time
+        assert 0.15 < elapsed < 0.4
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRateLimiter:
+
+    def test_bucket_per_host(self):
+        limiter = RateLimiter()
+        assert limiter.bucket("https://www.basketball-reference.com/a") is \
+               limiter.bucket("https://www.basketball-reference.com/b")
+        assert limiter.bucket("https://www.basketball-reference.com/a") is not \
+               limiter.bucket("https://www.sports-reference.com/a")
+
+    @pytest.mark.parametrize("grow_to, expected", [(None, 2), (1, 2), (4, 4)])
+    def test_max_in_flight(self, grow_to, expected):
+        limiter = RateLimiter(rate=1000, burst=10, max_in_flight=2)
+        if grow_to:
+            limiter.ensure_max_in_flight(grow_to)
+        lock = Lock()
+        in_flight = []
+        peak = []
+
+        def request(_):
+            with limiter.limit("https://www.basketball-reference.com/"):
+                with lock:
+                    in_flight.append(1)
+                    peak.append(len(in_flight))
+                time.sleep(0.05)
+                with lock:
+                    in_flight.pop()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(request, range(6)))
+        assert max(peak) == expected
@@ -0,0 +1,123 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from bballer.scrapers.download import Download
+from bballer.scrapers.ratelimit import RateLimiter
+from bballer.scrapers.retry import RetryPolicy, parse_retry_after
+from bballer.scrapers.transport import Transport, Response, aiohttp
+
+
+class FlakyTransport(Transport):
+    """Returns the queued responses in order, and raises the queued exceptions."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requested = 0
+
+    def get(self, url, headers=None):
+        self.requested += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def response(status, headers=None):
+    return Response(url="https://www.basketball-reference.com/", status_code=status, content=b"ok", headers=headers or {})
+
+
+@pytest.fixture
+def download():
+    original_policy, original_limiter = Download.retry_policy, Download.limiter
+    Download.set_retry_policy(RetryPolicy(max_attempts=3, base=0.01, cap=0.01))
+    Download.set_rate_limit(rate=1000)
+    yield Download
+    Download.set_retry_policy(original_policy)
+    Download.limiter = original_limiter
+
+
+class TestRetryPolicy:
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("120") == 120
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert 25 < parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+
+    def test_next_delay(self):
+        policy = RetryPolicy(max_attempts=3, base=1, cap=3)
+        assert policy.next_delay(0, response=response(404)) is None
+        assert 0 <= policy.next_delay(0, response=response(503)) <= 1
+        assert 0 <= policy.next_delay(1, error=requests.ConnectionError()) <= 2
+        assert policy.next_delay(2, response=response(503)) is None
+        assert policy.next_delay(0, response=response(429, {"Retry-After": "2"})) == 2
+        assert policy.next_delay(0, response=response(429, {"Retry-After": "86400"})) is None
+        assert policy.next_delay(0, error=ValueError()) is None
+
+    @pytest.mark.skipif(aiohttp is None, reason="aiohttp isn't installed")
+    def test_aiohttp_errors(self):
+        policy = RetryPolicy(base=1, cap=3)
+        assert policy.next_delay(0, error=aiohttp.ServerDisconnectedError()) is not None
+        assert policy.next_delay(0, error=aiohttp.ClientPayloadError()) is not None
+        assert policy.next_delay(0, error=aiohttp.InvalidURL("no_such_url")) is None
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(base=1, cap=3)
+        assert all([policy.backoff(10) <= 3 for _ in range(100)])
+
+
+class TestDownloadRetries:
+
+    def test_retry_server_error(self, download, use_transport):
+        transport = FlakyTransport(response(503), requests.ConnectionError(), response(200))
+        use_transport(transport)
+        assert download.download("https://www.basketball-reference.com/players/r/retry01.html") == b"ok"
+        assert transport.requested == 3
+
+    def test_retry_timeout(self, download, use_transport):
+        transport = FlakyTransport(requests.Timeout(), response(200))
+        use_transport(transport)
+        assert download.download("https://www.basketball-reference.com/players/r/retry04.html") == b"ok"
+        assert transport.requested == 2
+
+    def test_permanent_errors_are_not_retried(self, download, use_transport):
+        for error in (requests.exceptions.InvalidURL(), requests.exceptions.SSLError()):
+            transport = FlakyTransport(error, response(200))
+            use_transport(transport)
+            with pytest.raises(type(error)):
+                download.download("https://www.basketball-reference.com/players/r/retry05.html")
+            assert transport.requested == 1
+
+    def test_give_up(self, download, use_transport):
+        use_transport(FlakyTransport(response(503), response(503), response(503)))
+        with pytest.raises(requests.HTTPError):
+            download.download("https://www.basketball-reference.com/players/r/retry02.html")
+
+    def test_too_many_requests_pauses_everyone(self, download, use_transport):
+        download.set_retry_policy(RetryPolicy(max_attempts=3, base=0.01, cap=1))
+        use_transport(FlakyTransport(response(429, {"Retry-After": "1"}), response(200)))
+        start = time.monotonic()
+        download.download("https://www.basketball-reference.com/players/r/retry03.html")
+        assert time.monotonic() - start >= 0.9
+        assert download.limiter._paused_until > 0
+
+    def test_retry_after_beyond_cap(self, download, use_transport):
+        transport = use_transport(FlakyTransport(response(429, {"Retry-After": "86400"}), response(200)))
+        with pytest.raises(requests.HTTPError):
+            download.download("https://www.basketball-reference.com/players/r/retry06.html")
+        assert transport.requested == 1
+        assert download.limiter._paused_until == 0
+
+
+class TestPause:
+
+    def test_pause(self):
+        limiter = RateLimiter(rate=1000)
+        limiter.pause(0.1)
+        start = time.monotonic()
+        with limiter.limit("https://www.basketball-reference.com/") as waited:
+            assert waited >= 0.09
+        assert time.monotonic() - start >= 0.09
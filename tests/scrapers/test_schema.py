@@ -0,0 +1,54 @@
+from bs4 import BeautifulSoup
+
+from bballer.models.advanced_stats import AdvancedStatLine
+from bballer.scrapers.base import DataStatRow
+from bballer.scrapers.schema import Schema, Column, to_int, to_float, to_str, to_number
+
+ROW = '<table><tr><th data-stat="season"><a href="/2004.html">2003-04</a></th><td data-stat="g">79</td>' \
+      '<td data-stat="efg_pct">.438</td><td data-stat="plus_minus">+12</td><td data-stat="mp" csk="2325">38:45</td>' \
+      '<td data-stat="pos">SG</td><td data-stat="ws_per_48">0</td><td data-stat="fg3"></td></tr></table>'
+
+
+def row():
+    return DataStatRow(BeautifulSoup(ROW, "html.parser").find("tr"))
+
+
+class TestConverters:
+
+    def test_to_number(self):
+        assert to_number("12") == 12 and isinstance(to_number("12"), int)
+        assert to_number("-.5") == -0.5
+        assert to_number("2003-04") == "2003-04"
+        assert to_number("1e5") == "1e5"
+
+    def test_typed_converters_fall_back(self):
+        assert to_int("+12") == 12
+        assert to_int("1.5") == 1.5
+        assert isinstance(to_float("0"), float)
+        assert to_float("SG") == "SG"
+        assert to_str("12") == "12"
+
+
+class TestSchema:
+
+    def test_decode(self):
+        schema = Schema(season=Column("season", to_str), games_played=Column("g", to_int),
+                        effective_fg_percentage=Column("efg_pct", to_float), plus_minus=Column("plus_minus", to_int),
+                        seconds_played=Column("mp", to_int, attr="csk"), position=Column("pos"),
+                        three_fg_made=Column("fg3", to_int), steals=Column("stl", to_int))
+        assert schema.decode(row()) == {"season": "2003-04", "games_played": 79, "effective_fg_percentage": 0.438,
+                                        "plus_minus": 12, "seconds_played": 2325, "position": "SG",
+                                        "three_fg_made": None, "steals": None}
+
+    def test_decode_matches_get(self):
+        stats = row()
+        for name, value in AdvancedStatLine.columns.decode(stats).items():
+            assert value == stats.get(AdvancedStatLine.columns.columns[name].stat)
+
+    def test_fill_and_empty(self):
+        class Model:
+            pass
+
+        schema = Schema(games_played=Column("g", to_int))
+        assert schema.fill(Model(), row()).games_played == 79
+        assert schema.empty() == {"games_played": None}
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bballer.scrapers.download import Download
+from bballer.scrapers.singleflight import SingleFlight
+from bballer.scrapers.transport import Transport, Response
+
+
+class SlowTransport(Transport):
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, headers=None):
+        self.requested.append(url)
+        time.sleep(0.2)
+        return Response(url=url, status_code=200, content=b"<html></html>")
+
+
+@pytest.fixture
+def transport(use_transport):
+    return use_transport(SlowTransport())
+
+
+class TestSingleFlight:
+
+    def test_concurrent_downloads(self, transport):
+        url = "https://www.basketball-reference.com/teams/CLE/2016.html"
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            pages = list(executor.map(lambda _: Download.download(url), range(5)))
+        assert pages == [b"<html></html>"] * 5
+        assert transport.requested == [url]
+
+    def test_concurrent_async_downloads(self, transport):
+        url = "https://www.basketball-reference.com/teams/CLE/2017.html"
+
+        async def download_all():
+            return await asyncio.gather(*[Download.download_async(url) for _ in range(5)])
+
+        assert asyncio.run(download_all()) == [b"<html></html>"] * 5
+        assert transport.requested == [url]
+
+    def test_page_is_cached_before_the_flight_ends(self, transport, monkeypatch):
+        url = "https://www.basketball-reference.com/teams/CLE/2018.html"
+        cached = []
+
+        def do(key, fn, *args):
+            result = fn(*args)
+            cached.append(Download.memory_cache.get(key))
+            return result
+
+        monkeypatch.setattr(Download._in_flight, "do", do)
+        Download.download(url)
+        assert cached and cached[0] is not None
+
+    def test_exception_is_shared(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, "key", fail) for _ in range(3)]
+        assert all([isinstance(f.exception(), ValueError) for f in futures])
+        assert flight.do("key", lambda: 1) == 1
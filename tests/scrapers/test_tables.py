@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from bballer.scrapers.DraftPageScraper import DraftPageScraper
+from bballer.scrapers.GameLogScraper import GameLogScraper
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.TeamScraper import TeamPageScraper
+from bballer.scrapers.base import Scraper, DataStatRow
+from bballer.scrapers.tables import TableIndex, parse_table
+from tests.scrapers.utils import PAGES, as_data, get_resource
+
+RESOURCES = sorted(os.listdir(os.path.dirname(get_resource("w.html"))))
+FAST_SCRAPERS = (PlayerPageScraper, GameLogScraper, DraftPageScraper, TeamPageScraper)
+
+
+def read(fn):
+    with open(get_resource(fn), "rb") as f:
+        return f.read()
+
+
+def rows(table):
+    """Every row of a table as the tags, attributes and text of its cells."""
+    return [[(cell.name, cell.attrs, cell.get_text()) for cell in row] for row in rows_of_soup(table)]
+
+
+def rows_of_soup(table):
+    return [tr.find_all(["th", "td"]) for tr in table.find_all("tr")]
+
+
+def data_stats(table):
+    stats = [DataStatRow(tr) for tr in table.find_all("tr")]
+    return [{name: stat.get(name) for name in stat._cells} for stat in stats]
+
+
+class TestTables:
+
+    @pytest.mark.parametrize("fn", RESOURCES)
+    def test_tables_match_soup(self, fn):
+        scr = Scraper(get_resource(fn))
+        index = TableIndex(read(fn))
+        for table_id in index.ids():
+            fast, soup = index.get(table_id), scr.get_table_with_id(table_id)
+            assert soup is not None
+            assert rows(fast) == rows(soup)
+            assert data_stats(fast) == data_stats(soup)
+        for table_id in index.ids(commented=True):
+            fast, soup = index.get(table_id, commented=True), scr.get_commented_table_with_id(table_id)
+            assert rows(fast) == rows(soup)
+            assert data_stats(fast) == data_stats(soup)
+
+    @pytest.mark.parametrize("scraper,fn", [(scraper, fn) for scraper, fn in PAGES if scraper in FAST_SCRAPERS])
+    def test_identical_models(self, scraper, fn):
+        soup = as_data(scraper(get_resource(fn)).get_content())
+        scraper.use_fast_tables()
+        try:
+            fast = scraper(get_resource(fn))
+            assert as_data(fast.get_content()) == soup
+        finally:
+            scraper.use_fast_tables(False)
+
+    def test_no_tree_for_tables_only(self):
+        DraftPageScraper.use_fast_tables()
+        try:
+            scr = DraftPageScraper(get_resource("draft_2003.html"))
+            assert len(list(scr.get_content())) > 0
+            assert scr._tree is None
+        finally:
+            DraftPageScraper.use_fast_tables(False)
+
+    def test_parse_table(self):
+        table = parse_table('<table id="t"><tr class="full_table"><th data-stat="season">2004-05<td data-stat="g">'
+                            '<a href="/x">80</a><td data-stat="pct">.5<br>&amp;</table>')
+        assert table["id"] == "t"
+        row = DataStatRow(table.find("tr", class_="full_table"))
+        assert row.get("season") == "2004-05"
+        assert row.get("g") == 80
+        assert row.child("g")["href"] == "/x"
+        assert row.get("pct") == ".5&"
+        assert table.find("th", string="2004-05").find_parent("tr") is row.row
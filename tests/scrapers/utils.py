@@ -1,5 +1,72 @@
+import dataclasses
+import types
 from pathlib import Path
+from typing import Dict
+
+from bs4 import PageElement
+
+from bballer.models.lazy import LazySequence
+from bballer.scrapers.DraftPageScraper import DraftPageScraper
+from bballer.scrapers.GameLogScraper import GameLogScraper
+from bballer.scrapers.PlayerListScraper import PlayerListScraper
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from bballer.scrapers.TeamScraper import TeamPageScraper
+from bballer.scrapers.base import DataStatRow
+from bballer.scrapers.tables import Element
+from bballer.scrapers.transport import Transport, Response
 
 
 def get_resource(fn):
     return str(Path(__file__).parent.parent.joinpath("resources").joinpath(fn).absolute())
+
+
+class ResourceTransport(Transport):
+    """Serves pages from the resources folder instead of basketball-reference."""
+
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, headers=None):
+        self.requested.append(url)
+        if url not in self.pages:
+            return Response(url=url, status_code=404, content=b"")
+        with open(get_resource(self.pages[url]), "rb") as f:
+            return Response(url=url, status_code=200, content=f.read())
+
+
+PAGES = [(PlayerPageScraper, fn) for fn in
+         ["anfernee_simons.html", "ben_wallace.html", "carmelo_anthony.html", "chamberlain.html", "chris_mullin.html",
+          "dj_mbenga.html", "julius_erving.html", "lebron_james.html", "shayok.html", "tom_hawkins.html"]] + \
+        [(TeamPageScraper, "cavs.html"), (DraftPageScraper, "draft_2003.html"), (PlayerListScraper, "w.html"),
+         (GameLogScraper, "lbj_gamelog_2003.html")]
+
+
+def as_data(obj):
+    """Turns a model into plain values, consuming generators on the way, so models can be compared field by field."""
+    if dataclasses.is_dataclass(obj):
+        return {f.name: as_data(getattr(obj, f.name)) for f in dataclasses.fields(obj) if f.init}
+    if isinstance(obj, (list, tuple, types.GeneratorType, LazySequence)):
+        return [as_data(o) for o in obj]
+    if isinstance(obj, dict):
+        return {k: as_data(v) for k, v in obj.items()}
+    if hasattr(obj, "__dict__"):
+        return {k: as_data(v) for k, v in vars(obj).items()}
+    return obj
+
+
+def assert_detached(obj, seen=None):
+    """Fails if {obj} refers to a part of a page, or to a generator which has yet to parse one."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen or isinstance(obj, (str, int, float, type(None))):
+        return
+    seen.add(id(obj))
+    assert not isinstance(obj, (PageElement, Element, DataStatRow, types.GeneratorType)), obj
+    if isinstance(obj, (list, tuple)):
+        items = obj
+    elif isinstance(obj, dict):
+        items = obj.values()
+    else:
+        items = getattr(obj, "__dict__", {}).values()
+    for item in items:
+        assert_detached(item, seen)
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from bballer import player, team, draft
+from bballer.scrapers.journal import Journal
+from bballer.scrapers.misc import BulkScraper, TotalMinutesScraper
+from tests.scrapers.utils import ResourceTransport, get_resource
+
+
+@pytest.fixture
+def transport(use_transport):
+    return use_transport(ResourceTransport({
+        "https://www.basketball-reference.com/players/a/anthoca01.html": "carmelo_anthony.html",
+        "https://www.basketball-reference.com/teams/CLE/": "cavs.html",
+        "https://www.basketball-reference.com/draft/NBA_2003.html": "draft_2003.html",
+        TotalMinutesScraper.get_url(2000): "nba_2000_totals.html",
+    }))
+
+
+def test_get_by_id_async(transport):
+    anthony = asyncio.run(player.get_by_id_async("anthoca01"))
+    assert anthony.name == "Carmelo Anthony"
+
+
+def test_get_by_code_async(transport):
+    cavs = asyncio.run(team.get_by_code_async("CLE"))
+    assert cavs.name == "Cleveland Cavaliers"
+
+
+def test_draft_year_async(transport):
+    picks = asyncio.run(draft.year_async(2003))
+    assert picks[0].player.name == "LeBron James"
+
+
+def test_all_in_season_async(transport, tmp_path):
+    with Journal(str(tmp_path / "2000.db")) as journal:
+        urls = set(TotalMinutesScraper(2000).get_player_urls())
+        for url in urls:
+            journal.record(url, "recorded")
+
+        async def scrape():
+            return [p async for p in player.all_in_season_async(2000, journal)]
+        assert asyncio.run(scrape()) == ["recorded"] * len(urls)
+        assert transport.requested == [TotalMinutesScraper.get_url(2000)]
+
+
+def test_scrape_all_async():
+    async def scrape_all():
+        bulk_scr = BulkScraper(list(map(get_resource, ["lebron_james.html", "carmelo_anthony.html"])), workers=1)
+        return [p async for p in bulk_scr.scrape_all_async()]
+
+    processed = asyncio.run(scrape_all())
+    assert len(processed) == 2
+    assert "Carmelo Anthony" in [p.name for p in processed]
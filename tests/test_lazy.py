@@ -0,0 +1,50 @@
+import pytest
+
+from bballer.models.lazy import LazySequence
+
+
+def counting(n, produced):
+    for i in range(n):
+        produced.append(i)
+        yield i
+
+
+class TestLazySequence:
+
+    def test_produces_items_once(self):
+        produced = []
+        seq = LazySequence(counting(3, produced))
+        assert seq[1] == 1
+        assert produced == [0, 1]
+        assert list(seq) == list(seq) == [0, 1, 2]
+        assert produced == [0, 1, 2]
+        assert len(seq) == 3
+        assert seq[-1] == 2
+
+    def test_next(self):
+        seq = LazySequence(counting(2, []))
+        assert next(seq) == 0
+        assert next(seq) == 1
+        with pytest.raises(StopIteration):
+            next(seq)
+        assert list(seq) == [0, 1]
+
+    def test_empty(self):
+        seq = LazySequence([])
+        assert not seq
+        with pytest.raises(IndexError):
+            seq[0]
+
+    def test_error(self):
+        def failing():
+            yield 0
+            raise ValueError("broken row")
+
+        seq = LazySequence(failing())
+        assert seq[0] == 0
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                list(seq)
+            with pytest.raises(ValueError):
+                len(seq)
+        assert seq[0] == 0
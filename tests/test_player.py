@@ -1,4 +1,15 @@
+import pytest
+
 from bballer import player
+from bballer.scrapers.PlayerPageScraper import PlayerPageScraper
+from tests.scrapers.utils import ResourceTransport, assert_detached
+
+
+@pytest.fixture
+def transport(use_transport):
+    return use_transport(ResourceTransport({
+        "https://www.basketball-reference.com/players/a/anthoca01.html": "carmelo_anthony.html"}))
+
 
 def test_get_by_name():
     anthony = player.get_by_name("Carmelo Anthony")
@@ -17,4 +28,15 @@ def test_search():
 
 def test_get_by_url():
     anthony = player.get_by_url("https://www.basketball-reference.com/players/a/anthoca01.html")
-    assert anthony.name == "Carmelo Anthony"
\ No newline at end of file
+    assert anthony.name == "Carmelo Anthony"
+
+
+def test_detached_player(transport):
+    PlayerPageScraper.use_detached()
+    try:
+        anthony = player.get_by_id("anthoca01")
+        assert anthony.name == "Carmelo Anthony"
+        assert_detached(anthony)
+        assert player.get_by_id("anthoca01", lazy=True).name == "Carmelo Anthony"
+    finally:
+        PlayerPageScraper.use_detached(False)